@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, router, transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import CACHE_PREFIX, get_cache
+from .replicas import read_from
+
+# Поля пользователя, которые нужны для проверки прав. Пароль, код
+# подтверждения и профиль в кэш не попадают.
+AUTH_USER_FIELDS = (
+    'id', 'username', 'role', 'is_active', 'is_staff', 'is_superuser',
+)
+
+
+def user_cache_key(user_id):
+    return f'{CACHE_PREFIX}:auth:user:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    """
+    Сбрасывает кэш сразу и еще раз после фиксации транзакции, чтобы
+    параллельный запрос не закэшировал старые значения до нее.
+    """
+    key = user_cache_key(user_id)
+    get_cache().delete(key)
+    transaction.on_commit(lambda: get_cache().delete(key))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация, которая кэширует поля пользователя для проверки
+    прав (AUTH_USER_FIELDS) на AUTH_USER_CACHE_TIMEOUT секунд, чтобы не
+    читать строку User при каждом запросе. Остальные поля загружаются
+    из базы при первом обращении. Кэш сбрасывается сигналами при
+    изменении или удалении пользователя, в том числе при смене роли
+    и блокировке. Кэш заполняется с основной базы: отстающая реплика
+    вернула бы старую роль.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                'Token contained no recognizable user identification')
+        cache = get_cache()
+        key = user_cache_key(user_id)
+        values = cache.get(key)
+        if values is None:
+            with read_from(DEFAULT_DB_ALIAS):
+                user = super().get_user(validated_token)
+            cache.set(
+                key,
+                {field: getattr(user, field) for field in AUTH_USER_FIELDS},
+                settings.AUTH_USER_CACHE_TIMEOUT,
+            )
+            return user
+        user = self.user_from_cache(values)
+        if not user.is_active:
+            raise AuthenticationFailed(
+                'User is inactive', code='user_inactive')
+        return user
+
+    def user_from_cache(self, values):
+        """
+        Экземпляр пользователя с отложенной загрузкой полей, которых нет
+        в кэше.
+        """
+        names = [
+            field.attname for field in self.user_model._meta.concrete_fields
+            if field.attname in values
+        ]
+        return self.user_model.from_db(
+            router.db_for_read(self.user_model), names,
+            [values[name] for name in names],
+        )
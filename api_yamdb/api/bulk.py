@@ -0,0 +1,293 @@
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.exceptions import ValidationError
+
+from reviews.models import Category, Genre, Review, Title
+from reviews.signals import shift_title_ratings
+from users.models import User
+
+from .fast_serializers import datetime_field
+from .serializers import (TITLE_EXISTS_MESSAGE, ReviewImportSerializer,
+                          TitleBulkSerializer)
+
+CONFLICT_MESSAGE = 'Данные изменились во время записи, повторите запрос.'
+REVIEW_EXISTS_MESSAGE = 'Автор уже оставлял рецензию на это произведение.'
+
+
+@contextmanager
+def keep_timestamps(*models):
+    """
+    Отключает auto_now/auto_now_add, чтобы bulk_create сохранил даты из
+    импортируемых данных, а не подставил текущее время.
+    """
+    saved = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(
+                    field, 'auto_now_add', False):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def bulk_insert(model, objects, batch_size):
+    """
+    bulk_create с пачкой не больше допустимой для СУБД: SQLite в Django 2.2
+    вставляет строки через UNION ALL и ограничен 500 строками в запросе.
+    """
+    limit = connection.ops.bulk_batch_size(
+        model._meta.concrete_fields, objects)
+    return model.objects.bulk_create(
+        objects, batch_size=max(min(batch_size, limit), 1))
+
+
+def check_bulk_payload(data):
+    """
+    Пакет - непустой список не длиннее settings.BULK_MAX_ITEMS.
+    """
+    if not isinstance(data, list) or not data:
+        raise ValidationError(
+            {'non_field_errors': ['Ожидается непустой список объектов.']})
+    if len(data) > settings.BULK_MAX_ITEMS:
+        raise ValidationError({'non_field_errors': [
+            f'Не больше {settings.BULK_MAX_ITEMS} объектов в запросе.']})
+
+
+def bulk_status(results):
+    """
+    201, если записаны все объекты, 400 - если ни одного,
+    иначе 207 Multi-Status.
+    """
+    created = sum(result['status'] == 201 for result in results)
+    if created == len(results):
+        return status.HTTP_201_CREATED
+    if not created:
+        return status.HTTP_400_BAD_REQUEST
+    return status.HTTP_207_MULTI_STATUS
+
+
+def does_not_exist(value, slug_name='slug'):
+    return serializers.SlugRelatedField.default_error_messages[
+        'does_not_exist'].format(slug_name=slug_name, value=value)
+
+
+class BulkCreator:
+    """
+    Пакетное создание объектов: каждый элемент проверяется сериализатором,
+    связанные объекты и конфликты уникальности ищутся одним запросом на
+    весь пакет, корректные элементы записываются bulk_create в одной
+    транзакции. Результат - список по элементам в порядке запроса:
+    {'status': 201, 'data': ...} или {'status': 400, 'errors': ...}.
+    """
+    serializer_class = None
+    batch_size = 500
+
+    def __init__(self, items):
+        self.items = items
+
+    def load(self, valid_data):
+        """
+        Загружает связанные объекты для всех корректных элементов.
+        """
+        raise NotImplementedError
+
+    def check(self, data):
+        """
+        Возвращает ошибки элемента или пустой словарь.
+        """
+        raise NotImplementedError
+
+    def write(self, valid_data):
+        """
+        Записывает элементы и возвращает их представления.
+        """
+        raise NotImplementedError
+
+    def create(self):
+        item_serializers = [
+            self.serializer_class(data=item) for item in self.items]
+        checked = [
+            serializer.validated_data if serializer.is_valid() else None
+            for serializer in item_serializers
+        ]
+        self.load([data for data in checked if data is not None])
+        results, accepted = [], []
+        for serializer, data in zip(item_serializers, checked):
+            errors = serializer.errors if data is None else self.check(data)
+            if errors:
+                results.append(
+                    {'status': status.HTTP_400_BAD_REQUEST, 'errors': errors})
+            else:
+                results.append(None)
+                accepted.append(data)
+        if accepted:
+            try:
+                with transaction.atomic():
+                    created = iter(self.write(accepted))
+            except IntegrityError:
+                raise ValidationError(
+                    {'non_field_errors': [CONFLICT_MESSAGE]})
+            results = [
+                result or {'status': status.HTTP_201_CREATED,
+                           'data': next(created)}
+                for result in results
+            ]
+        return results
+
+
+class TitleBulkCreator(BulkCreator):
+    """
+    Пакетное создание произведений: жанры, категории и занятые названия
+    загружаются тремя запросами на весь пакет, связи с жанрами
+    записываются одним bulk_create в промежуточную таблицу.
+    """
+    serializer_class = TitleBulkSerializer
+
+    def load(self, valid_data):
+        self.genres = {
+            genre.slug: genre for genre in Genre.objects.filter(slug__in={
+                slug for data in valid_data for slug in data['genre']
+            }).only('id', 'slug', 'name')
+        }
+        self.categories = dict(Category.objects.filter(
+            slug__in={data['category'] for data in valid_data}
+        ).values_list('slug', 'id'))
+        self.taken = set(Title.objects.filter(
+            name__in={data['name'] for data in valid_data}
+        ).values_list('name', flat=True))
+
+    def check(self, data):
+        errors = {}
+        missing = [slug for slug in data['genre'] if slug not in self.genres]
+        if missing:
+            errors['genre'] = [does_not_exist(missing[0])]
+        if data['category'] not in self.categories:
+            errors['category'] = [does_not_exist(data['category'])]
+        if data['name'] in self.taken:
+            errors['non_field_errors'] = [TITLE_EXISTS_MESSAGE]
+        if not errors:
+            self.taken.add(data['name'])
+        return errors
+
+    def write(self, valid_data):
+        titles = [
+            Title(
+                name=data['name'],
+                year=data['year'],
+                description=data.get('description'),
+                category_id=self.categories[data['category']],
+            )
+            for data in valid_data
+        ]
+        bulk_insert(Title, titles, self.batch_size)
+        if any(title.pk is None for title in titles):
+            ids = {
+                (name, category_id): pk
+                for pk, name, category_id in Title.objects.filter(
+                    name__in={title.name for title in titles}
+                ).values_list('id', 'name', 'category_id')
+            }
+            for title in titles:
+                title.pk = ids[(title.name, title.category_id)]
+        results, links = [], []
+        for title, data in zip(titles, valid_data):
+            genres = sorted(
+                {self.genres[slug] for slug in data['genre']},
+                key=lambda genre: genre.name,
+            )
+            links.extend(
+                Title.genre.through(title_id=title.pk, genre_id=genre.id)
+                for genre in genres
+            )
+            results.append({
+                'id': title.pk,
+                'name': title.name,
+                'year': title.year,
+                'rating': None,
+                'description': title.description,
+                'genre': [genre.slug for genre in genres],
+                'category': data['category'],
+            })
+        bulk_insert(Title.genre.through, links, self.batch_size)
+        return results
+
+
+class ReviewBulkCreator(BulkCreator):
+    """
+    Пакетный импорт отзывов администратором: произведения, авторы и уже
+    оставленные отзывы загружаются тремя запросами на весь пакет, рейтинг
+    произведений корректируется одним запросом на произведение, так как
+    bulk_create не вызывает сигналы.
+    """
+    serializer_class = ReviewImportSerializer
+
+    def load(self, valid_data):
+        self.titles = dict(Title.objects.filter(
+            pk__in={data['title'] for data in valid_data}
+        ).values_list('id', 'name'))
+        self.authors = dict(User.objects.filter(
+            username__in={data['author'] for data in valid_data}
+        ).values_list('username', 'id'))
+        self.reviewed = set(Review.objects.filter(
+            title_id__in=self.titles, author_id__in=self.authors.values()
+        ).values_list('title_id', 'author_id'))
+
+    def check(self, data):
+        errors = {}
+        if data['title'] not in self.titles:
+            errors['title'] = [does_not_exist(data['title'], 'id')]
+        author_id = self.authors.get(data['author'])
+        if author_id is None:
+            errors['author'] = [does_not_exist(data['author'], 'username')]
+        if (data['title'], author_id) in self.reviewed:
+            errors['non_field_errors'] = [REVIEW_EXISTS_MESSAGE]
+        if not errors:
+            self.reviewed.add((data['title'], author_id))
+        return errors
+
+    def write(self, valid_data):
+        now = timezone.now()
+        reviews = [
+            Review(
+                title_id=data['title'],
+                author_id=self.authors[data['author']],
+                text=data['text'],
+                score=data['score'],
+                pub_date=now,
+                modified=now,
+            )
+            for data in valid_data
+        ]
+        bulk_insert(Review, reviews, self.batch_size)
+        if any(review.pk is None for review in reviews):
+            ids = {
+                (title_id, author_id): pk
+                for pk, title_id, author_id in Review.objects.filter(
+                    title_id__in={review.title_id for review in reviews},
+                    author_id__in={review.author_id for review in reviews},
+                ).values_list('id', 'title_id', 'author_id')
+            }
+            for review in reviews:
+                review.pk = ids[(review.title_id, review.author_id)]
+        shift_title_ratings(
+            Counter((review.title_id, review.score) for review in reviews))
+        return [
+            {
+                'id': review.pk,
+                'title': self.titles[review.title_id],
+                'author': data['author'],
+                'pub_date': datetime_field.to_representation(review.pub_date),
+                'text': review.text,
+                'score': review.score,
+            }
+            for review, data in zip(reviews, valid_data)
+        ]
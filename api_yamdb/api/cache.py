@@ -0,0 +1,140 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+CACHE_PREFIX = 'api'
+
+
+def get_cache():
+    """
+    Кэш для ответов API. Бэкенд задается в настройках CACHES
+    (locmem, файловый, Redis), псевдоним - настройкой API_CACHE_ALIAS.
+    """
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def _generation_key(namespace):
+    return f'{CACHE_PREFIX}:{namespace}:generation'
+
+
+def _new_generation():
+    """
+    Начальное значение поколения берется от текущего времени, чтобы после
+    вытеснения счетчика из кэша не вернуться к ранее выданному значению.
+    """
+    return int(time.time() * 1000)
+
+
+def get_generation(namespace):
+    cache = get_cache()
+    key = _generation_key(namespace)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _new_generation(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def _bumped_key(namespace):
+    return f'{CACHE_PREFIX}:{namespace}:bumped'
+
+
+def bump_generation(namespace):
+    """
+    Увеличивает поколение кэша, после чего все ранее сохраненные
+    ответы пространства имен перестают использоваться. При настроенных
+    репликах еще READ_AFTER_WRITE_SECONDS секунд пространство имен
+    считается недавно измененным: реплики могут не содержать изменений.
+    """
+    cache = get_cache()
+    key = _generation_key(namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_generation(), timeout=None)
+    if settings.DATABASE_REPLICAS:
+        cache.set(
+            _bumped_key(namespace), True, settings.READ_AFTER_WRITE_SECONDS)
+
+
+def recently_bumped(*namespaces):
+    """
+    Поколение одного из пространств имен менялось в последние
+    READ_AFTER_WRITE_SECONDS секунд и реплики могут от него отставать.
+    """
+    if not settings.DATABASE_REPLICAS or not namespaces:
+        return False
+    return bool(get_cache().get_many(
+        [_bumped_key(namespace) for namespace in namespaces]))
+
+
+def _count(namespace, metric):
+    cache = get_cache()
+    key = f'{CACHE_PREFIX}:{namespace}:{metric}'
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def get_stats(namespace):
+    """
+    Возвращает число попаданий и промахов кэша для пространства имен.
+    """
+    cache = get_cache()
+    return {
+        metric: cache.get(f'{CACHE_PREFIX}:{namespace}:{metric}', 0)
+        for metric in ('hits', 'misses')
+    }
+
+
+class CachedListMixin:
+    """
+    Кэширует данные ответа list по параметрам запроса. Ключ включает
+    поколение пространства имен cache_namespace, которое увеличивается
+    при создании и удалении объектов через viewset, а также сигналами
+    моделей, поэтому устаревшие ответы никогда не отдаются. Пока
+    реплики могут отставать от нового поколения, ответы не кэшируются,
+    чтобы не сохранить под ним устаревшие данные реплики.
+    """
+    cache_namespace = None
+
+    def get_list_cache_key(self, request):
+        params = sorted(
+            (key, sorted(values))
+            for key, values in request.query_params.lists()
+        )
+        digest = hashlib.md5(
+            f'{request.get_host()}{request.path}{params}'.encode()
+        ).hexdigest()
+        generation = get_generation(self.cache_namespace)
+        return f'{CACHE_PREFIX}:{self.cache_namespace}:{generation}:{digest}'
+
+    def list(self, request, *args, **kwargs):
+        cache = get_cache()
+        key = self.get_list_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            _count(self.cache_namespace, 'hits')
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+        _count(self.cache_namespace, 'misses')
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200 and not recently_bumped(
+                self.cache_namespace):
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        bump_generation(self.cache_namespace)
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        bump_generation(self.cache_namespace)
@@ -0,0 +1,83 @@
+import hashlib
+from calendar import timegm
+
+from django.core.exceptions import ValidationError
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """
+    Поддержка условных GET-запросов (If-None-Match, If-Modified-Since)
+    для list и retrieve. При совпадении валидаторов отдается 304 без
+    выборки и сериализации объектов.
+
+    Валидаторы списка задает get_list_validators: они должны меняться при
+    любом изменении списка, включая удаление, и быть намного дешевле
+    выборки списка. Для объекта используется поле modified_field.
+    Валидаторы читаются из той же базы, что и ответ, поэтому отстающая
+    реплика не может отдать старые данные под новым ETag.
+    """
+    modified_field = 'modified'
+
+    def get_list_validators(self):
+        """
+        Возвращает пару (значения для ETag, дата изменения или None).
+        """
+        raise NotImplementedError
+
+    def get_etag_extra(self):
+        """
+        Дополнительные значения, от которых зависит представление объекта,
+        например состояние вложенных справочников.
+        """
+        return ()
+
+    def make_etag(self, *parts):
+        request = self.request
+        raw = repr((
+            request.path,
+            sorted(request.query_params.lists()),
+            request.accepted_renderer.format,
+            self.get_etag_extra(),
+            parts,
+        ))
+        return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+    def list(self, request, *args, **kwargs):
+        parts, modified = self.get_list_validators()
+        return self.conditional_response(
+            self.make_etag(*parts), modified,
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            modified = self.get_queryset().filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            ).prefetch_related(None).order_by().values_list(
+                self.modified_field, flat=True).first()
+        except (TypeError, ValueError, ValidationError):
+            modified = None
+        if modified is None:
+            return super().retrieve(request, *args, **kwargs)
+        return self.conditional_response(
+            self.make_etag(modified), modified,
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def conditional_response(self, etag, modified, handler,
+                             request, *args, **kwargs):
+        last_modified = (
+            timegm(modified.utctimetuple()) if modified is not None else None
+        )
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if 200 <= response.status_code < 300 or response.status_code == 304:
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
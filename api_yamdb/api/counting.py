@@ -0,0 +1,91 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+from .cache import CACHE_PREFIX, get_cache
+
+
+def is_whole_table(queryset):
+    """
+    Запрос читает все строки таблицы: без фильтров, DISTINCT,
+    группировки, объединений и срезов.
+    """
+    query = queryset.query
+    return not (
+        query.where or query.distinct or query.group_by
+        or query.combinator or query.low_mark
+        or query.high_mark is not None
+    )
+
+
+def planner_estimate(queryset):
+    """
+    Оценка числа строк таблицы по статистике планировщика PostgreSQL
+    (pg_class.reltuples). None для других баз и таблиц без статистики.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [connection.ops.quote_name(queryset.model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+def estimated_count(queryset):
+    """
+    Число строк для пагинации. Отфильтрованные выборки считаются
+    точно. Для всей таблицы берется оценка планировщика, а без нее
+    (SQLite) - точный COUNT(*), который кэшируется на
+    COUNT_CACHE_TIMEOUT секунд, если таблица больше
+    ESTIMATED_COUNT_THRESHOLD строк. Маленькие таблицы всегда
+    считаются точно.
+    """
+    if not is_whole_table(queryset):
+        return queryset.count()
+    threshold = settings.ESTIMATED_COUNT_THRESHOLD
+    cache = get_cache()
+    key = (
+        f'{CACHE_PREFIX}:count:{queryset.db}:'
+        f'{queryset.model._meta.db_table}'
+    )
+    count = cache.get(key)
+    if count is not None:
+        return count
+    count = planner_estimate(queryset)
+    if count is None or count < threshold:
+        count = queryset.count()
+    if count >= threshold:
+        cache.set(key, count, settings.COUNT_CACHE_TIMEOUT)
+    return count
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Django-пагинатор, который для больших таблиц берет оценку числа
+    строк вместо COUNT(*): число страниц у последних страниц может
+    отличаться от точного.
+    """
+
+    @cached_property
+    def count(self):
+        if isinstance(self.object_list, QuerySet):
+            return estimated_count(self.object_list)
+        return Paginator.count.func(self)
+
+
+class EstimatedCountAdminMixin:
+    """
+    Раздел админки без точного COUNT(*) по всей таблице: пагинация по
+    оценке числа строк, общее число записей рядом с результатами
+    фильтра не считается.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
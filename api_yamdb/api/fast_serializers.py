@@ -0,0 +1,374 @@
+import re
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.http import Http404
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError as BadRequest
+from rest_framework.response import Response
+
+from reviews.models import Review, Title, TitleStats
+
+from .serializers import stats_representation
+
+datetime_field = serializers.DateTimeField()
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+EXPAND_PARAM = 'expand'
+EXPAND_REVIEWS = re.compile(r'^reviews(?:\[:(\d+)\])?$')
+EXPAND_REVIEWS_DEFAULT = 3
+
+
+def parse_field_list(value):
+    return [name for name in value.split(',') if name]
+
+
+def requested_fields(request, available):
+    """
+    Поля ответа из параметров ?fields= и ?omit= (имена через запятую):
+    None, если набор полей не ограничен. Неизвестные имена - ошибка 400.
+    """
+    params = request.query_params
+    if FIELDS_PARAM not in params and OMIT_PARAM not in params:
+        return None
+    fields = set(available)
+    errors = {}
+    for param in (FIELDS_PARAM, OMIT_PARAM):
+        if param not in params:
+            continue
+        names = set(parse_field_list(params[param]))
+        unknown = names - set(available)
+        if unknown:
+            errors[param] = [
+                f'Неизвестные поля: {", ".join(sorted(unknown))}.']
+        elif param == FIELDS_PARAM:
+            fields &= names
+        else:
+            fields -= names
+    if errors:
+        raise BadRequest(errors)
+    return fields
+
+
+def requested_reviews(request):
+    """
+    Число последних отзывов для встраивания в произведения из параметра
+    ?expand=reviews или ?expand=reviews[:N], None без параметра.
+    """
+    if EXPAND_PARAM not in request.query_params:
+        return None
+    limit = None
+    for name in parse_field_list(request.query_params[EXPAND_PARAM]):
+        match = EXPAND_REVIEWS.match(name)
+        if match is None:
+            raise BadRequest(
+                {EXPAND_PARAM: [f'Неизвестное вложение: {name}.']})
+        limit = int(match.group(1) or EXPAND_REVIEWS_DEFAULT)
+    if limit is not None and not 0 < limit <= settings.EXPAND_REVIEWS_MAX:
+        raise BadRequest({EXPAND_PARAM: [
+            f'Число отзывов должно быть от 1 до '
+            f'{settings.EXPAND_REVIEWS_MAX}.']})
+    return limit
+
+
+def latest_reviews(title_ids, limit):
+    """
+    По limit последних отзывов каждого произведения одним запросом:
+    ROW_NUMBER() по произведению в подзапросе FROM (через extra), так
+    как Django не умеет фильтровать по оконной функции. Возвращает
+    {id произведения: [отзывы]} в представлении ReviewFastSerializer.
+    """
+    ranked = Review.objects.filter(title_id__in=title_ids).annotate(
+        position=Window(
+            RowNumber(),
+            partition_by=[F('title_id')],
+            order_by=[F('pub_date').desc(), F('id').asc()],
+        ),
+    ).values('id', 'position')
+    sql, params = ranked.query.get_compiler(ranked.db).as_sql()
+    quote = connections[ranked.db].ops.quote_name
+    rows = list(Review.objects.extra(
+        where=[
+            f'{quote(Review._meta.db_table)}.{quote("id")} IN ('
+            f'SELECT {quote("id")} FROM ({sql}) ranked '
+            f'WHERE {quote("position")} <= %s)'
+        ],
+        params=[*params, limit],
+    ).order_by('-pub_date', 'id').values(
+        'title_id', *ReviewFastSerializer.values))
+    serializer = ReviewFastSerializer()
+    reviews = defaultdict(list)
+    for row in rows:
+        reviews[row['title_id']].append(serializer.to_representation(row))
+    return reviews
+
+
+class FastSerializer:
+    """
+    Сериализатор только для чтения, который строит ответ из строк
+    values() без создания экземпляров моделей и полей DRF. Результат
+    должен совпадать с обычным сериализатором побайтно, это проверяют
+    тесты. При ограниченном наборе полей fields выбираются только
+    колонки из field_values для этих полей и key_values, нужные
+    пагинации.
+    """
+    values = ()
+    field_values = {}
+    key_values = ('id',)
+
+    def __init__(self, fields=None):
+        self.fields = fields
+
+    def wants(self, name):
+        return self.fields is None or name in self.fields
+
+    def get_values(self):
+        if self.fields is None:
+            return self.values
+        values = list(self.key_values)
+        for name in self.field_values:
+            if name in self.fields:
+                values.extend(
+                    value for value in self.field_values[name]
+                    if value not in values)
+        return values
+
+    def get_rows(self, queryset):
+        return queryset.prefetch_related(None).values(*self.get_values())
+
+    def serialize(self, rows):
+        return [self.represent(row) for row in rows]
+
+    def represent(self, row, *args):
+        """
+        Представление строки с учетом fields: невыбранные колонки
+        подставляются как None, лишние поля убираются из ответа.
+        """
+        if self.fields is None:
+            return self.to_representation(row, *args)
+        data = self.to_representation(
+            {**dict.fromkeys(self.values), **row}, *args)
+        return {
+            name: value for name, value in data.items()
+            if name in self.fields
+        }
+
+    def to_representation(self, row):
+        raise NotImplementedError
+
+
+class TitleFastSerializer(FastSerializer):
+    """
+    Повторяет TitleListSerializer. Жанры страницы выбираются одним
+    запросом к промежуточной таблице и группируются по произведениям.
+    Если задано reviews, в каждое произведение встраиваются его
+    последние отзывы (latest_reviews).
+    """
+    values = (
+        'id', 'name', 'year', 'rating_sum', 'rating_count', 'description',
+        'category_id', 'category__name', 'category__slug',
+    )
+    field_values = {
+        'id': ('id',),
+        'name': ('name',),
+        'year': ('year',),
+        'rating': ('rating_sum', 'rating_count'),
+        'review_count': ('rating_count',),
+        'description': ('description',),
+        'genre': (),
+        'category': ('category_id', 'category__name', 'category__slug'),
+    }
+
+    def __init__(self, fields=None, reviews=None):
+        super().__init__(fields)
+        self.reviews = reviews
+
+    def serialize(self, rows):
+        rows = list(rows)
+        title_ids = [row['id'] for row in rows]
+        genres = defaultdict(list)
+        if self.wants('genre'):
+            links = Title.genre.through.objects.filter(
+                title_id__in=title_ids
+            ).order_by('genre__name').values_list(
+                'title_id', 'genre__name', 'genre__slug')
+            for title_id, name, slug in links:
+                genres[title_id].append({'name': name, 'slug': slug})
+        data = [self.represent(row, genres[row['id']]) for row in rows]
+        if self.reviews and rows:
+            reviews = latest_reviews(title_ids, self.reviews)
+            for title, title_id in zip(data, title_ids):
+                title['reviews'] = reviews[title_id]
+        return data
+
+    def to_representation(self, row, genres=()):
+        category = None
+        if row['category_id'] is not None:
+            category = {
+                'name': row['category__name'],
+                'slug': row['category__slug'],
+            }
+        rating = None
+        if row['rating_count']:
+            rating = row['rating_sum'] / row['rating_count']
+        return {
+            'id': row['id'],
+            'name': row['name'],
+            'year': row['year'],
+            'rating': rating,
+            'review_count': row['rating_count'],
+            'description': row['description'],
+            'genre': list(genres),
+            'category': category,
+        }
+
+
+class TitleDetailFastSerializer(TitleFastSerializer):
+    """
+    Повторяет TitleDetailSerializer: распределение оценок выбирается
+    тем же запросом через LEFT JOIN к TitleStats.
+    """
+    stats_values = tuple(
+        'stats__' + TitleStats.score_field(score)
+        for score in TitleStats.SCORES
+    )
+    values = TitleFastSerializer.values + stats_values
+    field_values = {
+        **TitleFastSerializer.field_values,
+        'stats': ('rating_count', 'rating_sum') + stats_values,
+    }
+
+    @classmethod
+    def stats(cls, row):
+        return stats_representation(
+            row['rating_count'], row['rating_sum'], {
+                score: row[value]
+                for score, value in zip(TitleStats.SCORES, cls.stats_values)
+            })
+
+    def to_representation(self, row, genres=()):
+        data = super().to_representation(row, genres)
+        data['stats'] = self.stats(row)
+        return data
+
+
+class ReviewFastSerializer(FastSerializer):
+    """
+    Повторяет ReviewSerializer.
+    """
+    values = (
+        'id', 'title__name', 'author__username', 'pub_date', 'text', 'score',
+        'comment_count',
+    )
+    field_values = {
+        'id': ('id',),
+        'title': ('title__name',),
+        'author': ('author__username',),
+        'pub_date': ('pub_date',),
+        'text': ('text',),
+        'score': ('score',),
+        'comment_count': ('comment_count',),
+    }
+    key_values = ('id', 'pub_date')
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'title': row['title__name'],
+            'author': row['author__username'],
+            'pub_date': datetime_field.to_representation(row['pub_date']),
+            'text': row['text'],
+            'score': row['score'],
+            'comment_count': row['comment_count'],
+        }
+
+
+class CommentFastSerializer(FastSerializer):
+    """
+    Повторяет CommentSerializer.
+    """
+    values = ('id', 'review__text', 'author__username', 'pub_date', 'text')
+    field_values = {
+        'id': ('id',),
+        'review': ('review__text',),
+        'author': ('author__username',),
+        'pub_date': ('pub_date',),
+        'text': ('text',),
+    }
+    key_values = ('id', 'pub_date')
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'review': row['review__text'],
+            'author': row['author__username'],
+            'pub_date': datetime_field.to_representation(row['pub_date']),
+            'text': row['text'],
+        }
+
+
+class FastReadMixin:
+    """
+    Отдает list и retrieve через fast_serializer_class вместо
+    сериализатора DRF. Пагинаторы работают со строками values(), курсор
+    берет значения полей сортировки из словаря. Проверка прав на уровне
+    объекта получает экземпляр модели, собранный из строки. Параметры
+    ?fields= и ?omit= сужают ответ и список выбираемых колонок.
+    """
+    fast_serializer_class = None
+
+    def get_fast_serializer_class(self):
+        return self.fast_serializer_class
+
+    def get_fast_serializer_kwargs(self, fast_serializer_class):
+        return {'fields': requested_fields(
+            self.request, fast_serializer_class.field_values)}
+
+    def get_fast_serializer(self):
+        fast_serializer_class = self.get_fast_serializer_class()
+        return fast_serializer_class(
+            **self.get_fast_serializer_kwargs(fast_serializer_class))
+
+    def list(self, request, *args, **kwargs):
+        fast_serializer = self.get_fast_serializer()
+        rows = fast_serializer.get_rows(
+            self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(
+                fast_serializer.serialize(page))
+        return Response(fast_serializer.serialize(rows))
+
+    def retrieve(self, request, *args, **kwargs):
+        fast_serializer = self.get_fast_serializer()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            rows = list(fast_serializer.get_rows(queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}))[:1])
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+        if not rows:
+            raise Http404
+        self.check_object_permissions(
+            request, self.get_permission_object(queryset, rows[0]))
+        return Response(fast_serializer.serialize(rows)[0])
+
+    def get_permission_object(self, queryset, row):
+        """
+        Экземпляр модели из строки values() для проверки прав на уровне
+        объекта без повторного запроса: поля и связи, которых нет в
+        строке (например, obj.author), загружаются при обращении.
+        """
+        model = queryset.model
+        names = [
+            field.attname for field in model._meta.concrete_fields
+            if field.attname in row
+        ]
+        return model.from_db(
+            queryset.db, names, [row[name] for name in names])
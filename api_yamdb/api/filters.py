@@ -1,22 +1,30 @@
 import django_filters
 
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class TitleFilters(django_filters.rest_framework.FilterSet):
     """
-    Класс фильтрации полей модели Title для TitleViewSet
+    Класс фильтрации полей модели Title для TitleViewSet.
+    Фильтры не строят список допустимых значений, поэтому не выполняют
+    SELECT DISTINCT по таблицам при каждом запросе.
+    Параметр search - полнотекстовый поиск по названию и описанию
+    с сортировкой по релевантности.
     """
-    genre = django_filters.rest_framework.AllValuesFilter(
+    genre = django_filters.rest_framework.CharFilter(
         field_name='genre__slug'
     )
-    category = django_filters.rest_framework.AllValuesFilter(
+    category = django_filters.rest_framework.CharFilter(
         field_name='category__slug'
     )
-    name = django_filters.rest_framework.AllValuesFilter(
+    name = django_filters.rest_framework.CharFilter(
         field_name='name',
         lookup_expr='istartswith'
     )
+    search = django_filters.rest_framework.CharFilter(
+        method='filter_search'
+    )
 
     class Meta:
         model = Title
@@ -26,3 +34,6 @@ class TitleFilters(django_filters.rest_framework.FilterSet):
             'year',
             'name'
         ]
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from api.cache import get_stats
+from api.signals import CACHE_NAMESPACES
+
+
+class Command(BaseCommand):
+    """
+    Выводит число попаданий и промахов кэша списков API.
+    """
+    help = 'Показывает статистику кэша списков API.'
+
+    def handle(self, *args, **options):
+        for namespace in CACHE_NAMESPACES.values():
+            stats = get_stats(namespace)
+            total = stats['hits'] + stats['misses']
+            ratio = stats['hits'] / total if total else 0
+            self.stdout.write(
+                f'{namespace}: попаданий {stats["hits"]}, '
+                f'промахов {stats["misses"]}, доля попаданий {ratio:.1%}'
+            )
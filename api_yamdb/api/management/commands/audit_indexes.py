@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.query_plans import HOT_QUERIES, explain, plan_problems
+
+
+class Command(BaseCommand):
+    """
+    Выполняет EXPLAIN для запросов горячих путей API (HOT_QUERIES) и
+    завершается с ошибкой, если какой-то из них читает таблицу целиком
+    или сортирует всю выборку, то есть не нашел подходящего индекса.
+    """
+    help = 'Проверяет, что запросы горячих путей API используют индексы.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--plans',
+            action='store_true',
+            help='Вывести планы всех запросов.',
+        )
+
+    def handle(self, *args, **options):
+        failed = []
+        for name, build_queryset in HOT_QUERIES.items():
+            queryset = build_queryset()
+            plan = explain(queryset)
+            problems = plan_problems(queryset, plan)
+            if problems:
+                failed.append(name)
+                self.stdout.write(self.style.ERROR(
+                    f'{name}: {", ".join(problems)}'))
+            else:
+                self.stdout.write(f'{name}: ok')
+            if problems or options['plans']:
+                self.stdout.write(plan)
+        if failed:
+            raise CommandError(
+                'Запросы без подходящих индексов: ' + ', '.join(failed))
+        self.stdout.write(self.style.SUCCESS('Индексы в порядке.'))
@@ -0,0 +1,280 @@
+import json
+import logging
+import math
+import platform
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.middleware import QueryCounter
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+PREFIX = '/api/v1'
+
+ENDPOINTS = {
+    'titles-list': lambda ids: f'{PREFIX}/titles/',
+    'titles-page': lambda ids: f'{PREFIX}/titles/?page=5',
+    'titles-filter': lambda ids: (
+        f'{PREFIX}/titles/?genre={ids.choice("genres")}'),
+    'titles-search': lambda ids: f'{PREFIX}/titles/?search=звезда',
+    'title-detail': lambda ids: f'{PREFIX}/titles/{ids.choice("titles")}/',
+    'title-stats': lambda ids: (
+        f'{PREFIX}/titles/{ids.choice("titles")}/stats/'),
+    'categories-list': lambda ids: f'{PREFIX}/categories/',
+    'genres-list': lambda ids: f'{PREFIX}/genres/',
+    'reviews-list': lambda ids: (
+        f'{PREFIX}/titles/{ids.choice("titles")}/reviews/'),
+    'review-detail': lambda ids: (
+        '{}/titles/{}/reviews/{}/'.format(PREFIX, *ids.choice('reviews'))),
+    'comments-list': lambda ids: (
+        '{}/titles/{}/reviews/{}/comments/'.format(
+            PREFIX, *ids.choice('reviews'))),
+    'users-me': lambda ids: f'{PREFIX}/users/me/',
+}
+
+METRICS = ('p50_ms', 'p95_ms', 'p99_ms', 'rps', 'queries_per_request')
+
+
+def percentile(values, percent):
+    """
+    Перцентиль по методу ближайшего ранга.
+    """
+    if not values:
+        return None
+    values = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+class SampleIds:
+    """
+    Идентификаторы существующих объектов, из которых случайно собираются
+    адреса запросов. Генератор с фиксированным seed делает набор адресов
+    воспроизводимым.
+    """
+
+    def __init__(self, seed, limit=1000):
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.ids = {
+            'titles': list(
+                Title.objects.values_list('id', flat=True)[:limit]),
+            'genres': list(
+                Genre.objects.values_list('slug', flat=True)[:limit]),
+            'reviews': list(
+                Review.objects.values_list('title_id', 'id')[:limit]),
+        }
+
+    def choice(self, kind):
+        if not self.ids[kind]:
+            raise CommandError(
+                f'В базе нет объектов для {kind}, выполните seed_yamdb.')
+        with self.lock:
+            return self.random.choice(self.ids[kind])
+
+
+class Command(BaseCommand):
+    """
+    Нагрузочный тест API: параллельно выполняет запросы к эндпоинтам
+    /api/v1/ через настоящий URLconf и middleware (django.test.Client) и
+    выводит для каждого перцентили задержки p50/p95/p99, запросы в секунду
+    и число SQL-запросов на запрос. Результат можно сохранить как базовый
+    (--save) и сравнить с ним следующий прогон (--compare); при
+    деградации сверх --max-regression команда завершается с ошибкой.
+    """
+    help = 'Измеряет задержку и пропускную способность API.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'endpoints', nargs='*', metavar='endpoint',
+            help='Эндпоинты для проверки, по умолчанию все: {}.'.format(
+                ', '.join(ENDPOINTS)),
+        )
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--user', help='Имя пользователя для авторизованных запросов.')
+        parser.add_argument(
+            '--save', metavar='PATH', help='Сохранить результат в JSON.')
+        parser.add_argument(
+            '--compare', metavar='PATH',
+            help='Сравнить с сохраненным ранее результатом.',
+        )
+        parser.add_argument(
+            '--max-regression', type=float, default=20.0,
+            help='Допустимый рост p95 в процентах при сравнении.',
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests должен быть больше нуля.')
+        endpoints = options['endpoints'] or list(ENDPOINTS)
+        unknown = set(endpoints) - set(ENDPOINTS)
+        if unknown:
+            raise CommandError(
+                'Неизвестные эндпоинты: {}.'.format(
+                    ', '.join(sorted(unknown))))
+        self.user = self.get_user(options['user'])
+        if 'users-me' in endpoints and self.user is None:
+            endpoints.remove('users-me')
+        ids = SampleIds(options['seed'])
+        performance_logger = logging.getLogger('api.performance')
+        level = performance_logger.level
+        performance_logger.setLevel(logging.ERROR)
+        try:
+            results = {
+                name: self.run_endpoint(name, ids, options)
+                for name in endpoints
+            }
+        finally:
+            performance_logger.setLevel(level)
+        report = {'meta': self.get_meta(options), 'endpoints': results}
+        self.print_results(results)
+        if options['save']:
+            with open(options['save'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+            self.stdout.write(f'Результат сохранен в {options["save"]}.')
+        if options['compare']:
+            self.compare(report, options['compare'],
+                         options['max_regression'])
+
+    def get_user(self, username):
+        if username is None:
+            return User.objects.order_by('-is_superuser', 'id').first()
+        try:
+            return User.objects.get(username=username)
+        except User.DoesNotExist:
+            raise CommandError(f'Пользователь {username} не найден.')
+
+    def get_meta(self, options):
+        return {
+            'created': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'requests': options['requests'],
+            'concurrency': options['concurrency'],
+            'seed': options['seed'],
+            'dataset': {
+                model._meta.model_name: model.objects.count()
+                for model in (User, Category, Genre, Title, Review, Comment)
+            },
+        }
+
+    def make_client(self):
+        if self.user is None:
+            return Client()
+        token = AccessToken.for_user(self.user)
+        return Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def worker(self, name, ids, count):
+        """
+        Выполняет count запросов одним клиентом и возвращает задержки,
+        число SQL-запросов и число ошибок. Запросы считаются в потоке
+        воркера: соединения с базой у каждого потока свои.
+        """
+        client = self.make_client()
+        build_url = ENDPOINTS[name]
+        timings, queries, errors = [], [], 0
+        try:
+            for _ in range(count):
+                url = build_url(ids)
+                counter = QueryCounter()
+                with ExitStack() as stack:
+                    for db in connections.all():
+                        stack.enter_context(db.execute_wrapper(counter))
+                    started = time.perf_counter()
+                    response = client.get(url)
+                    timings.append(time.perf_counter() - started)
+                queries.append(counter.count)
+                if response.status_code >= 400:
+                    errors += 1
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                connections.close_all()
+        return timings, queries, errors
+
+    def run_endpoint(self, name, ids, options):
+        self.worker(name, ids, options['warmup'])
+        concurrency = max(options['concurrency'], 1)
+        total = options['requests']
+        counts = [
+            total // concurrency + (1 if number < total % concurrency else 0)
+            for number in range(concurrency)
+        ]
+        started = time.perf_counter()
+        if concurrency == 1:
+            chunks = [self.worker(name, ids, total)]
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                chunks = list(executor.map(
+                    lambda count: self.worker(name, ids, count), counts))
+        elapsed = time.perf_counter() - started
+
+        timings = [value * 1000 for chunk in chunks for value in chunk[0]]
+        queries = [value for chunk in chunks for value in chunk[1]]
+        return {
+            'requests': len(timings),
+            'errors': sum(chunk[2] for chunk in chunks),
+            'rps': round(len(timings) / elapsed, 1) if elapsed else None,
+            'p50_ms': round(percentile(timings, 50), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'p99_ms': round(percentile(timings, 99), 2),
+            'queries_per_request': round(sum(queries) / len(queries), 2),
+        }
+
+    def print_results(self, results):
+        header = '{:<18}{:>9}{:>8}{:>10}{:>10}{:>10}{:>10}{:>9}'
+        self.stdout.write(header.format(
+            'endpoint', 'requests', 'errors', 'rps',
+            'p50, ms', 'p95, ms', 'p99, ms', 'queries'))
+        for name, result in results.items():
+            self.stdout.write(header.format(
+                name, result['requests'], result['errors'], result['rps'],
+                result['p50_ms'], result['p95_ms'], result['p99_ms'],
+                result['queries_per_request']))
+
+    def compare(self, report, path, max_regression):
+        """
+        Сравнивает прогон с базовым: рост p95 больше max_regression
+        процентов или рост числа SQL-запросов считается деградацией.
+        """
+        try:
+            with open(path, encoding='utf-8') as file:
+                baseline = json.load(file)
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Не удалось прочитать {path}: {error}')
+        regressions = []
+        self.stdout.write(f'Сравнение с {path}:')
+        for name, result in report['endpoints'].items():
+            before = baseline['endpoints'].get(name)
+            if before is None:
+                continue
+            changes = []
+            for metric in METRICS:
+                old, new = before.get(metric), result.get(metric)
+                if old and new is not None:
+                    changes.append(
+                        f'{metric} {old} -> {new} ({(new - old) / old:+.0%})')
+            self.stdout.write(f'  {name}: ' + ', '.join(changes))
+            if before.get('p95_ms') and result['p95_ms'] > (
+                    before['p95_ms'] * (1 + max_regression / 100)):
+                regressions.append(f'{name}: p95 {result["p95_ms"]} ms')
+            if result['queries_per_request'] > before.get(
+                    'queries_per_request', math.inf):
+                regressions.append(
+                    f'{name}: {result["queries_per_request"]} SQL-запросов')
+        if regressions:
+            raise CommandError(
+                'Производительность ухудшилась: ' + '; '.join(regressions))
+        self.stdout.write(self.style.SUCCESS('Деградаций не обнаружено.'))
@@ -0,0 +1,135 @@
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from .bench_api import percentile
+
+
+def build_request(url):
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    if parts.query:
+        path = f'{path}?{parts.query}'
+    return (
+        f'GET {path} HTTP/1.1\r\n'
+        f'Host: {parts.netloc}\r\n'
+        'Accept: application/json\r\n'
+        'Connection: close\r\n'
+        '\r\n'
+    ).encode()
+
+
+def send_slowly(sock, data, delay, chunks):
+    """
+    Отправляет запрос частями с паузами, как медленный клиент: заголовки
+    приходят на сервер за delay секунд.
+    """
+    if delay <= 0 or chunks < 2:
+        sock.sendall(data)
+        return
+    size = -(-len(data) // chunks)
+    for start in range(0, len(data), size):
+        if start:
+            time.sleep(delay / (chunks - 1))
+        sock.sendall(data[start:start + size])
+
+
+def fetch(host, port, request, delay, chunks, timeout):
+    """
+    Один запрос: (статус, полное время, время ответа после отправки
+    запроса) в миллисекундах. Время ответа показывает ожидание свободного
+    обработчика на сервере без учета медленной отправки.
+    """
+    started = time.perf_counter()
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        send_slowly(sock, request, delay, chunks)
+        sent = time.perf_counter()
+        response = bytearray()
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            response += chunk
+    finished = time.perf_counter()
+    status_line = bytes(response).split(b'\r\n', 1)[0].split()
+    status = int(status_line[1]) if len(status_line) > 1 else 0
+    return status, (finished - started) * 1000, (finished - sent) * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает запущенный сервер параллельными медленными клиентами и '
+        'выводит пропускную способность и задержки: для сравнения '
+        'синхронных воркеров gunicorn и ASGI-сервера.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url', default='http://127.0.0.1:8000/api/v1/titles/',
+            help='Адрес запущенного сервера.')
+        parser.add_argument(
+            '--clients', type=int, default=50,
+            help='Число одновременных клиентов.')
+        parser.add_argument(
+            '--requests', type=int, default=4,
+            help='Запросов на клиента.')
+        parser.add_argument(
+            '--client-delay', type=float, default=0.5,
+            help='За сколько секунд клиент отправляет заголовки запроса.')
+        parser.add_argument(
+            '--chunks', type=int, default=5,
+            help='На сколько частей делится медленная отправка.')
+        parser.add_argument(
+            '--timeout', type=float, default=30,
+            help='Таймаут сокета в секундах.')
+
+    def handle(self, *args, **options):
+        parts = urlsplit(options['url'])
+        if parts.scheme != 'http' or not parts.hostname:
+            raise CommandError('Поддерживаются только адреса http://.')
+        host, port = parts.hostname, parts.port or 80
+        request = build_request(options['url'])
+        results, errors = [], []
+        lock = threading.Lock()
+
+        def client():
+            for _ in range(options['requests']):
+                try:
+                    result = fetch(
+                        host, port, request, options['client_delay'],
+                        options['chunks'], options['timeout'])
+                except OSError as error:
+                    with lock:
+                        errors.append(error)
+                    continue
+                with lock:
+                    results.append(result)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options['clients']) as executor:
+            for _ in range(options['clients']):
+                executor.submit(client)
+        elapsed = time.perf_counter() - started
+
+        failed = sum(1 for status, *_ in results if status != 200)
+        totals = [total for _, total, _ in results]
+        waits = [wait for *_, wait in results]
+        self.stdout.write(
+            f'{options["url"]}: {options["clients"]} клиентов, '
+            f'отправка за {options["client_delay"]} с')
+        self.stdout.write(
+            f'Запросов: {len(results)}, не 200: {failed}, '
+            f'ошибок соединения: {len(errors)}')
+        self.stdout.write(
+            f'Пропускная способность: {len(results) / elapsed:.1f} запр/с')
+        if results:
+            self.stdout.write(
+                f'Полное время, мс: p50 {percentile(totals, 50):.1f}, '
+                f'p95 {percentile(totals, 95):.1f}')
+            self.stdout.write(
+                f'Ответ после отправки, мс: p50 {percentile(waits, 50):.1f}, '
+                f'p95 {percentile(waits, 95):.1f}')
@@ -0,0 +1,95 @@
+import io
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.fast_serializers import ReviewFastSerializer, TitleFastSerializer
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer, orjson
+from reviews.models import Review, Title
+
+PAGES = {
+    'titles': (Title, TitleFastSerializer),
+    'reviews': (Review, ReviewFastSerializer),
+}
+
+
+class Command(BaseCommand):
+    """
+    Сравнивает JSONRenderer/JSONParser DRF с FastJSONRenderer/
+    FastJSONParser на страницах произведений и отзывов из базы: время
+    (лучшее из --repeat) и пик выделенной памяти при рендеринге, время
+    разбора того же JSON.
+    """
+    help = 'Сравнивает скорость и память JSON-рендереров и парсеров.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page-size', type=int, action='append', dest='page_sizes',
+            help='Размер страницы, можно указать несколько раз '
+                 '(по умолчанию 10 и 1000).',
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING(
+                'orjson не установлен, FastJSONRenderer использует json.'))
+        self.repeat = max(options['repeat'], 1)
+        self.stdout.write(
+            '{:<9}{:>6}{:>8}{:>11}{:>11}{:>11}{:>11}{:>11}{:>11}'.format(
+                'page', 'rows', 'KiB', 'drf, ms', 'fast, ms',
+                'drf, KiB', 'fast, KiB', 'parse drf', 'parse fast'))
+        for name, (model, fast_serializer_class) in PAGES.items():
+            for page_size in options['page_sizes'] or (10, 1000):
+                self.run_page(name, model, fast_serializer_class, page_size)
+
+    def best_time(self, function):
+        best = None
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            function()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best * 1000
+
+    def peak_memory(self, function):
+        tracemalloc.start()
+        try:
+            function()
+            return tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+
+    def run_page(self, name, model, fast_serializer_class, page_size):
+        fast_serializer = fast_serializer_class()
+        results = fast_serializer.serialize(fast_serializer.get_rows(
+            model.objects.order_by('-id')[:page_size]))
+        if not results:
+            raise CommandError(f'Нет данных для {name}, выполните seed_yamdb.')
+        data = {
+            'count': model.objects.count(),
+            'next': 'http://localhost/api/v1/?page=2',
+            'previous': None,
+            'results': results,
+        }
+        drf, fast = JSONRenderer(), FastJSONRenderer()
+        body = drf.render(data)
+        if fast.render(data) != body:
+            raise CommandError(f'{name}: рендереры выдали разный JSON.')
+        self.stdout.write(
+            '{:<9}{:>6}{:>8.1f}{:>11.3f}{:>11.3f}{:>11.1f}{:>11.1f}'
+            '{:>11.3f}{:>11.3f}'.format(
+                name, len(results), len(body) / 1024,
+                self.best_time(lambda: drf.render(data)),
+                self.best_time(lambda: fast.render(data)),
+                self.peak_memory(lambda: drf.render(data)),
+                self.peak_memory(lambda: fast.render(data)),
+                self.best_time(
+                    lambda: JSONParser().parse(io.BytesIO(body))),
+                self.best_time(
+                    lambda: FastJSONParser().parse(io.BytesIO(body))),
+            ))
@@ -0,0 +1,85 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.fast_serializers import (CommentFastSerializer, ReviewFastSerializer,
+                                  TitleFastSerializer)
+from api.optimization import build_plan
+from api.serializers import (CommentSerializer, ReviewSerializer,
+                             TitleListSerializer)
+from reviews.models import Comment, Review, Title
+
+CASES = {
+    'titles': (Title, TitleListSerializer, TitleFastSerializer),
+    'reviews': (Review, ReviewSerializer, ReviewFastSerializer),
+    'comments': (Comment, CommentSerializer, CommentFastSerializer),
+}
+
+
+class Command(BaseCommand):
+    """
+    Микробенчмарк сериализации списков: время выборки и сериализации
+    --rows строк сериализатором DRF (с оптимизированным queryset) и
+    быстрым сериализатором из values(), в пересчете на 1000 строк.
+    Берется лучшее время из --repeat повторов.
+    """
+    help = 'Сравнивает сериализаторы DRF и быстрые сериализаторы.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'cases', nargs='*', metavar='case',
+            help='Что измерять: {}, по умолчанию все.'.format(
+                ', '.join(CASES)),
+        )
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        cases = options['cases'] or list(CASES)
+        unknown = set(cases) - set(CASES)
+        if unknown:
+            raise CommandError(
+                'Неизвестные варианты: {}.'.format(', '.join(unknown)))
+        self.stdout.write('{:<10}{:>7}{:>14}{:>14}{:>10}'.format(
+            'case', 'rows', 'drf, ms/1k', 'fast, ms/1k', 'speedup'))
+        for name in cases:
+            self.run_case(name, options['rows'], options['repeat'])
+
+    def measure(self, function, repeat):
+        best = None
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            result = function()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def run_case(self, name, rows, repeat):
+        model, serializer_class, fast_serializer_class = CASES[name]
+        queryset = model.objects.order_by('-id')[:rows]
+        plan = build_plan(serializer_class())
+        fast_serializer = fast_serializer_class()
+
+        drf_time, drf_data = self.measure(
+            lambda: serializer_class(
+                plan.apply(queryset), many=True).data,
+            repeat,
+        )
+        fast_time, fast_data = self.measure(
+            lambda: fast_serializer.serialize(
+                fast_serializer.get_rows(queryset)),
+            repeat,
+        )
+        count = len(fast_data)
+        if not count:
+            raise CommandError(
+                f'Нет данных для {name}, выполните seed_yamdb.')
+        if [dict(item) for item in drf_data] != fast_data:
+            raise CommandError(
+                f'{name}: результаты сериализаторов различаются.')
+        self.stdout.write('{:<10}{:>7}{:>14.1f}{:>14.1f}{:>9.1f}x'.format(
+            name, count,
+            drf_time * 1000 * 1000 / count,
+            fast_time * 1000 * 1000 / count,
+            drf_time / fast_time,
+        ))
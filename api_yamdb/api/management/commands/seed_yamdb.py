@@ -0,0 +1,165 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from api.bulk import bulk_insert, keep_timestamps
+from api.cache import bump_generation
+from api.management.commands.import_yamdb import Command as ImportCommand
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+
+def next_id(model):
+    return (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+
+
+class Command(BaseCommand):
+    """
+    Заполняет базу синтетическими данными заданного размера для
+    нагрузочного тестирования (bench_api). Данные воспроизводимы при
+    одинаковом --seed и добавляются к уже существующим.
+    """
+    help = 'Создает синтетический набор данных для бенчмарков.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--categories', type=int, default=5)
+        parser.add_argument('--genres', type=int, default=20)
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--genres-per-title', type=int, default=2)
+        parser.add_argument('--reviews-per-title', type=int, default=10)
+        parser.add_argument('--comments-per-review', type=int, default=2)
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        with transaction.atomic(), keep_timestamps(Title, Review, Comment):
+            users = self.create_users(options['users'])
+            categories = self.create_catalog(Category, options['categories'])
+            genres = self.create_catalog(Genre, options['genres'])
+            titles = self.create_titles(
+                options['titles'], categories, genres,
+                options['genres_per_title'])
+            reviews = self.create_reviews(
+                titles, users, options['reviews_per_title'])
+            self.create_comments(
+                reviews, users, options['comments_per_review'])
+        ImportCommand.reset_sequences()
+        call_command('rebuild_ratings', stdout=self.stdout)
+        call_command('rebuild_counters', stdout=self.stdout)
+        for namespace in ('categories', 'genres'):
+            bump_generation(namespace)
+
+    def report(self, model, count):
+        self.stdout.write(f'{model._meta.verbose_name_plural}: {count}')
+
+    def random_date(self):
+        return self.now - timedelta(
+            seconds=self.random.randint(0, 3 * 365 * 24 * 3600))
+
+    def create_users(self, count):
+        start = next_id(User)
+        password = make_password(None)
+        users = [
+            User(
+                id=start + number,
+                username=f'bench_user_{start + number}',
+                email=f'bench_user_{start + number}@yamdb.fake',
+                password=password,
+            )
+            for number in range(count)
+        ]
+        bulk_insert(User, users, self.batch_size)
+        self.report(User, count)
+        return [user.id for user in users]
+
+    def create_catalog(self, model, count):
+        start = next_id(model)
+        objects = [
+            model(
+                id=start + number,
+                name=f'{model._meta.verbose_name} {start + number}',
+                slug=f'bench-{model._meta.model_name}-{start + number}',
+            )
+            for number in range(count)
+        ]
+        bulk_insert(model, objects, self.batch_size)
+        self.report(model, count)
+        return [obj.id for obj in objects]
+
+    def create_titles(self, count, categories, genres, genres_per_title):
+        start = next_id(Title)
+        words = (
+            'звезда', 'дорога', 'город', 'ночь', 'море', 'война', 'мир',
+            'тайна', 'легенда', 'весна', 'star', 'road', 'night', 'sea',
+        )
+        titles = [
+            Title(
+                id=start + number,
+                name=(
+                    f'{" ".join(self.random.sample(words, 2)).capitalize()} '
+                    f'{start + number}'
+                ),
+                year=self.random.randint(1900, self.now.year),
+                description=' '.join(self.random.sample(words, 5)),
+                category_id=self.random.choice(categories),
+                modified=self.now,
+            )
+            for number in range(count)
+        ]
+        bulk_insert(Title, titles, self.batch_size)
+        links = [
+            Title.genre.through(title_id=title.id, genre_id=genre_id)
+            for title in titles
+            for genre_id in self.random.sample(
+                genres, min(genres_per_title, len(genres)))
+        ]
+        bulk_insert(Title.genre.through, links, self.batch_size)
+        self.report(Title, count)
+        return [title.id for title in titles]
+
+    def create_reviews(self, titles, users, per_title):
+        start = next_id(Review)
+        reviews = []
+        for title_id in titles:
+            for author_id in self.random.sample(
+                    users, min(per_title, len(users))):
+                pub_date = self.random_date()
+                reviews.append(Review(
+                    id=start + len(reviews),
+                    title_id=title_id,
+                    author_id=author_id,
+                    text='Синтетический отзыв',
+                    score=self.random.randint(1, 10),
+                    pub_date=pub_date,
+                    modified=pub_date,
+                ))
+        bulk_insert(Review, reviews, self.batch_size)
+        self.report(Review, len(reviews))
+        return [review.id for review in reviews]
+
+    def create_comments(self, reviews, users, per_review):
+        start = next_id(Comment)
+        comments = []
+        for review_id in reviews:
+            for _ in range(per_review):
+                pub_date = self.random_date()
+                comments.append(Comment(
+                    id=start + len(comments),
+                    review_id=review_id,
+                    author_id=self.random.choice(users),
+                    text='Синтетический комментарий',
+                    pub_date=pub_date,
+                    modified=pub_date,
+                ))
+        bulk_insert(Comment, comments, self.batch_size)
+        self.report(Comment, len(comments))
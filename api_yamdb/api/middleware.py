@@ -0,0 +1,155 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+from .replicas import (get_token_user_id, is_pinned_to_primary,
+                       next_replica, pin_to_primary, read_from)
+
+logger = logging.getLogger('api.performance')
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Запрос выполнил больше SQL-запросов, чем разрешено бюджетом маршрута.
+    """
+
+
+class QueryCounter:
+    """
+    Обертка выполнения SQL (connection.execute_wrapper), считающая число
+    запросов и время их выполнения без включения DEBUG.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+def get_route_label(request):
+    """
+    Имя обработчика в виде ViewSet.action (TitleViewSet.list), для
+    остальных представлений - имя класса или функции.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    view = match.func
+    view_class = (
+        getattr(view, 'cls', None) or getattr(view, 'view_class', None))
+    if view_class is None:
+        return match.view_name
+    actions = getattr(view, 'actions', None)
+    if actions:
+        action = actions.get(request.method.lower(), request.method.lower())
+        return f'{view_class.__name__}.{action}'
+    return view_class.__name__
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Для запросов к API считает число SQL-запросов, время работы с базой и
+    общее время обработки по маршрутам вида ViewSet.action. Метрики
+    пишутся в лог api.performance в виде JSON, при DEBUG добавляются
+    в заголовки ответа X-DB-Queries, X-DB-Time-Ms, X-Total-Time-Ms.
+
+    Если число запросов превышает бюджет из QUERY_BUDGETS, при
+    QUERY_BUDGET_STRICT выбрасывается QueryBudgetExceeded (так падают
+    тесты), иначе пишется предупреждение.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not request.path.startswith(settings.QUERY_INSTRUMENTATION_PREFIX):
+            return self.get_response(request)
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        route = get_route_label(request)
+        budget = settings.QUERY_BUDGETS.get(route)
+        metrics = {
+            'route': route,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': counter.count,
+            'db_time_ms': round(counter.duration * 1000, 2),
+            'total_time_ms': round(total * 1000, 2),
+            'budget': budget,
+        }
+        if settings.DEBUG:
+            response['X-DB-Queries'] = str(counter.count)
+            response['X-DB-Time-Ms'] = str(metrics['db_time_ms'])
+            response['X-Total-Time-Ms'] = str(metrics['total_time_ms'])
+
+        if budget is not None and counter.count > budget:
+            message = (
+                f'{route}: {counter.count} SQL-запросов '
+                f'при бюджете {budget} ({request.method} {request.path})'
+            )
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message, extra={'metrics': metrics})
+        logger.info(json.dumps(metrics), extra={'metrics': metrics})
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Выбирает базу для чтения в запросах к API. Безопасные запросы читают
+    с реплики (реплики чередуются по кругу, весь запрос читает с одной),
+    запросы на изменение и безопасные запросы пользователя, который
+    менял данные в последние READ_AFTER_WRITE_SECONDS секунд, - с
+    основной базы. Пользователь определяется по JWT без запросов к базе.
+    Потоковые ответы читают из той же базы при отдаче содержимого.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not (settings.DATABASE_REPLICAS and request.path.startswith(
+                settings.REPLICA_ROUTING_PREFIX)):
+            return self.get_response(request)
+        user_id = get_token_user_id(request)
+        alias = DEFAULT_DB_ALIAS
+        if request.method in SAFE_METHODS and not (
+                user_id is not None and is_pinned_to_primary(user_id)):
+            alias = next_replica()
+        with read_from(alias):
+            response = self.get_response(request)
+        if request.method not in SAFE_METHODS and user_id is not None:
+            pin_to_primary(user_id)
+        if response.streaming:
+            response.streaming_content = self.stream_from(
+                alias, response.streaming_content)
+        return response
+
+    def stream_from(self, alias, content):
+        content = iter(content)
+        finished = object()
+        while True:
+            with read_from(alias):
+                chunk = next(content, finished)
+            if chunk is finished:
+                return
+            yield chunk
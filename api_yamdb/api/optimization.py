@@ -0,0 +1,152 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+class QueryPlan:
+    """
+    Что нужно загрузить для сериализатора: связи для select_related,
+    объекты Prefetch и поля для only(). Пути задаются от модели
+    сериализатора, как в методах QuerySet.
+    """
+
+    def __init__(self):
+        self.select_related = []
+        self.prefetch_related = []
+        self.only = []
+
+    def apply(self, queryset, restrict_fields=True):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if restrict_fields and self.only:
+            queryset = queryset.only(*self.only)
+        return queryset
+
+
+def is_single_relation(field):
+    return field.is_relation and (field.many_to_one or field.one_to_one)
+
+
+def resolve_path(model, attrs):
+    """
+    Переводит source поля сериализатора в цепочку полей модели. Возвращает
+    None, если source не является полем модели (свойство, метод, '*') или
+    проходит через множественную связь.
+    """
+    fields = []
+    for attr in attrs:
+        if model is None or (fields and not is_single_relation(fields[-1])):
+            return None
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            if attr == 'pk':
+                field = model._meta.pk
+            else:
+                return None
+        fields.append(field)
+        model = field.related_model
+    return fields or None
+
+
+def add_all_fields(plan, model, prefix):
+    plan.only.extend(
+        prefix + field.name for field in model._meta.concrete_fields)
+
+
+def plan_relation(plan, field, name, model_field):
+    """
+    Добавляет в план загрузку связи для вложенного сериализатора или
+    RelatedField. Возвращает False, если поле не описывает связь.
+    """
+    related_model = model_field.related_model
+    if isinstance(field, serializers.ListSerializer):
+        plan.prefetch_related.append(Prefetch(
+            name, queryset=build_plan(field.child).apply(
+                related_model._default_manager.all())))
+    elif isinstance(field, serializers.BaseSerializer):
+        plan.select_related.append(name)
+        plan.only.append(name)
+        build_plan(field, plan, name + '__')
+    elif isinstance(field, serializers.ManyRelatedField):
+        child = field.child_relation
+        queryset = related_model._default_manager.all()
+        if isinstance(child, serializers.SlugRelatedField):
+            queryset = queryset.only(child.slug_field)
+        elif isinstance(child, serializers.PrimaryKeyRelatedField):
+            queryset = queryset.only('pk')
+        plan.prefetch_related.append(Prefetch(name, queryset=queryset))
+    elif isinstance(field, serializers.RelatedField):
+        plan.only.append(name)
+        if isinstance(field, serializers.SlugRelatedField):
+            plan.select_related.append(name)
+            plan.only.append(f'{name}__{field.slug_field}')
+        elif not isinstance(field, serializers.PrimaryKeyRelatedField):
+            plan.select_related.append(name)
+            add_all_fields(plan, related_model, name + '__')
+    else:
+        return False
+    return True
+
+
+def build_plan(serializer, plan=None, prefix=''):
+    """
+    Обходит поля сериализатора и собирает QueryPlan: вложенные сериализаторы
+    и RelatedField на прямых связях загружаются через select_related, на
+    множественных - через Prefetch со своим планом, обычные поля попадают
+    в only(). Если хотя бы одно поле берется не из колонки модели
+    (свойство, SerializerMethodField), загружаются все поля этой модели.
+    """
+    if plan is None:
+        plan = QueryPlan()
+    model = getattr(getattr(serializer, 'Meta', None), 'model', None)
+    if model is None:
+        return plan
+    plan.only.append(prefix + model._meta.pk.name)
+    load_all = False
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        path = resolve_path(model, field.source_attrs)
+        if path is None:
+            load_all = True
+            continue
+        *relations, last = path
+        through = prefix + ''.join(
+            relation.name + '__' for relation in relations)
+        if relations:
+            plan.select_related.append(through[:-2])
+        name = through + last.name
+        if plan_relation(plan, field, name, last):
+            continue
+        if last.is_relation and not is_single_relation(last):
+            load_all = True
+        else:
+            plan.only.append(name)
+    if load_all:
+        add_all_fields(plan, model, prefix)
+    return plan
+
+
+class QueryOptimizationMixin:
+    """
+    Подстраивает queryset представления под его сериализатор: связи,
+    которые выводит сериализатор, загружаются через select_related и
+    prefetch_related, а для безопасных методов выбираются только нужные
+    колонки (only). Оптимизация применяется в filter_queryset, поэтому
+    работает и при переопределенном get_queryset.
+    """
+
+    def get_query_plan(self):
+        serializer = self.get_serializer()
+        if isinstance(serializer, serializers.ListSerializer):
+            serializer = serializer.child
+        return build_plan(serializer)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return self.get_query_plan().apply(
+            queryset, restrict_fields=self.request.method in SAFE_METHODS)
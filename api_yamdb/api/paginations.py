@@ -1,12 +1,120 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import (BasePagination, CursorPagination,
+                                       LimitOffsetPagination,
+                                       PageNumberPagination)
 
 from api_yamdb.settings import PAGE_SIZE
 
+from .counting import EstimatedCountPaginator, estimated_count
 
-class CommentsPaginator(PageNumberPagination):
+
+class EstimatedPagePaginator(PageNumberPagination):
+    """
+    Постраничная пагинация с оценкой числа строк для больших таблиц.
+    """
+    django_paginator_class = EstimatedCountPaginator
+
+
+class EstimatedLimitOffsetPaginator(LimitOffsetPagination):
+    """
+    Пагинация limit/offset с оценкой числа строк для больших таблиц.
+    """
+
+    def get_count(self, queryset):
+        return estimated_count(queryset)
+
+
+class CommentsPagePaginator(EstimatedPagePaginator):
     """
     Пагинатор осуществляющий пагинацию комментариев.
     PAGE_SIZE - константа регулирующая число комментариев на страницы,
     определяется в настройках проекта.
     """
     page_size = PAGE_SIZE
+
+
+class IdCursorPaginator(CursorPagination):
+    """
+    Курсорная пагинация по убыванию id. Не выполняет COUNT(*) и OFFSET,
+    следующая страница выбирается по первичному ключу.
+    """
+    page_size = PAGE_SIZE
+    ordering = '-id'
+
+
+class PubDateCursorPaginator(CursorPagination):
+    """
+    Курсорная пагинация по убыванию даты публикации для отзывов и
+    комментариев, опирается на составные индексы (родитель, pub_date, id).
+    """
+    page_size = PAGE_SIZE
+    ordering = ('-pub_date', 'id')
+
+
+class OptionalCursorPaginator(BasePagination):
+    """
+    Пагинатор с курсорным режимом по запросу: если в запросе передан
+    параметр cursor (в том числе пустой), используется cursor_class,
+    иначе прежний постраничный пагинатор fallback_class.
+    """
+    cursor_class = None
+    fallback_class = None
+
+    def __init__(self):
+        self.paginator = self.fallback_class()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_class.cursor_query_param in request.query_params:
+            self.paginator = self.cursor_class()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.paginator.get_paginated_response_schema(schema)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_results(self, data):
+        return self.paginator.get_results(data)
+
+    @property
+    def display_page_controls(self):
+        return self.paginator.display_page_controls
+
+    def get_schema_fields(self, view):
+        return (
+            self.fallback_class().get_schema_fields(view)
+            + self.cursor_class().get_schema_fields(view)
+        )
+
+    def get_schema_operation_parameters(self, view):
+        return (
+            self.fallback_class().get_schema_operation_parameters(view)
+            + self.cursor_class().get_schema_operation_parameters(view)
+        )
+
+
+class TitlesPaginator(OptionalCursorPaginator):
+    """
+    Пагинатор произведений: номер страницы или курсор по id.
+    """
+    cursor_class = IdCursorPaginator
+    fallback_class = EstimatedPagePaginator
+
+
+class ReviewsPaginator(OptionalCursorPaginator):
+    """
+    Пагинатор отзывов: limit/offset или курсор по дате публикации.
+    """
+    cursor_class = PubDateCursorPaginator
+    fallback_class = EstimatedLimitOffsetPaginator
+
+
+class CommentsPaginator(OptionalCursorPaginator):
+    """
+    Пагинатор комментариев: номер страницы или курсор по дате публикации.
+    """
+    cursor_class = PubDateCursorPaginator
+    fallback_class = CommentsPagePaginator
@@ -0,0 +1,35 @@
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from .renderers import FastJSONRenderer, orjson
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser на orjson для тел запросов в UTF-8. orjson, как и
+    JSONParser DRF в строгом режиме, не принимает NaN и Infinity.
+    При ошибке разбора тело повторно разбирается стандартным парсером,
+    чтобы результат и текст ошибки совпадали; для других кодировок и без
+    orjson используется только стандартный парсер. Целые больше 64 бит
+    orjson возвращает как float, IntegerField отклоняет их с ошибкой 400,
+    как и слишком большие целые.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if (
+            orjson is None
+            or not self.strict
+            or encoding.lower().replace('-', '') != 'utf8'
+        ):
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(
+                io.BytesIO(body), media_type, parser_context)
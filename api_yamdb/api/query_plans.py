@@ -0,0 +1,84 @@
+import datetime as dt
+import re
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+from reviews.models import Comment, Review, Title
+
+SINCE = dt.datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+# Запросы горячих путей API в том виде, в каком их строят представления,
+# пагинаторы и валидаторы. Каждый должен обходиться без полного чтения
+# таблицы и без сортировки всей выборки.
+HOT_QUERIES = {
+    'reviews-page': lambda: Review.objects.filter(
+        title_id=1).order_by('-pub_date')[:10],
+    'reviews-cursor': lambda: Review.objects.filter(
+        title_id=1).order_by('-pub_date', 'id')[:10],
+    'review-author': lambda: Review.objects.filter(title_id=1, author_id=1),
+    'reviews-since': lambda: Review.objects.filter(
+        pub_date__gte=SINCE).order_by('pub_date')[:10],
+    'comments-page': lambda: Comment.objects.filter(
+        review_id=1).order_by('-pub_date')[:10],
+    'comments-cursor': lambda: Comment.objects.filter(
+        review_id=1).order_by('-pub_date', 'id')[:10],
+    'titles-page': lambda: Title.objects.order_by('-id')[:10],
+    'titles-by-name': lambda: Title.objects.order_by('name')[:10],
+    'titles-year': lambda: Title.objects.filter(
+        year=2000).order_by('-id')[:10],
+    'title-name': lambda: Title.objects.filter(name='Название'),
+    'titles-latest-modified': lambda: Title.objects.order_by(
+        '-modified')[:1],
+}
+
+SQLITE_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)')
+POSTGRESQL_SEQ_SCAN = re.compile(r'Seq Scan on (\w+)')
+POSTGRESQL_SORT = re.compile(r'^\s*(?:->\s*)?Sort\b')
+
+
+def explain(queryset):
+    """
+    План запроса. В PostgreSQL последовательное чтение и сортировка
+    запрещаются на время EXPLAIN, поэтому они попадают в план, только
+    если подходящего индекса нет: на маленьких тестовых таблицах
+    планировщик иначе выбирает их и при наличии индекса.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.explain()
+    with transaction.atomic(using=queryset.db):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('SET LOCAL enable_sort = off')
+        return queryset.explain()
+
+
+def plan_problems(queryset, plan=None):
+    """
+    Возвращает список проблем плана: полное чтение таблицы и сортировка
+    всей выборки. В SQLite SCAN (чтение таблицы или индекса целиком)
+    проблема, только если запрос фильтрует или сортирует строки: обход
+    в порядке первичного ключа или индекса без условий с LIMIT
+    останавливается на первых строках.
+    """
+    if plan is None:
+        plan = explain(queryset)
+    vendor = connections[queryset.db].vendor
+    problems = []
+    if vendor == 'postgresql':
+        problems.extend(
+            f'полное чтение {table}'
+            for table in POSTGRESQL_SEQ_SCAN.findall(plan))
+        if any(POSTGRESQL_SORT.match(line) for line in plan.splitlines()):
+            problems.append('сортировка всей выборки')
+        return problems
+    sorted_in_memory = 'USE TEMP B-TREE FOR ORDER BY' in plan
+    filtered = ' WHERE ' in str(queryset.query)
+    for line in plan.splitlines():
+        match = SQLITE_SCAN.search(line)
+        if match and (filtered or sorted_in_memory):
+            problems.append(f'полное чтение {match.group(1)}')
+    if sorted_in_memory:
+        problems.append('сортировка всей выборки')
+    return problems
@@ -0,0 +1,113 @@
+import csv
+import io
+import re
+
+from django.utils.encoding import force_str
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Числа, которые orjson записывает иначе, чем json: экспонента без
+# знака и нулей (1e16, 1e-7) и малые дроби без экспоненты (0.00005).
+# Шаблон экспоненты начинается с литерала, чтобы поиск не проверял каждую
+# позицию, и заканчивается разделителем JSON после числа, чтобы не
+# срабатывать на строки вида genre-1; совпадение внутри строки только
+# отправляет ответ в обычный рендерер.
+EXPONENT = re.compile(rb'e-?[0-9]+[,}\]]')
+SMALL_FRACTION = b'0.0000'
+
+LINE_SEPARATORS = (
+    (b'\xe2\x80\xa8', b'\\u2028'),
+    (b'\xe2\x80\xa9', b'\\u2029'),
+)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson. Вывод совпадает с JSONRenderer DRF: даты,
+    Decimal, UUID и ленивые строки передаются в JSONEncoder DRF, символы
+    U+2028 и U+2029 экранируются. Для вывода с отступами, нестандартных
+    настроек UNICODE_JSON/COMPACT_JSON, данных, которые orjson не
+    кодирует (целые больше 64 бит) или записывает иначе (очень малые
+    и большие float), и при отсутствии orjson используется стандартный
+    JSONRenderer. В отличие от него NaN и Infinity выводятся как null,
+    а не вызывают ошибку.
+    """
+    options = (
+        orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if orjson is not None else 0
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(
+                data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default,
+                option=self.options)
+        except orjson.JSONEncodeError:
+            ret = None
+        if (
+            ret is None
+            or SMALL_FRACTION in ret
+            or EXPONENT.search(ret)
+        ):
+            return super().render(
+                data, accepted_media_type, renderer_context)
+        for char, escaped in LINE_SEPARATORS:
+            if char in ret:
+                ret = ret.replace(char, escaped)
+        return ret
+
+
+class NDJSONRenderer(JSONRenderer):
+    """
+    JSON Lines: по объекту на строку. Используется выгрузками, которые
+    пишут строки потоком сами; render нужен для ответов с ошибками.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        return b''.join(self.render_row(row) for row in rows)
+
+    def render_row(self, row):
+        return FastJSONRenderer().render(row) + b'\n'
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    CSV с заголовком из ключей первой строки.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        if not rows:
+            return b''
+        return self.render_rows(rows, header=list(rows[0]))
+
+    def render_rows(self, rows, header=None):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if header is not None:
+            writer.writerow(header)
+        writer.writerows(
+            ['' if value is None else force_str(value)
+             for value in row.values()]
+            for row in rows
+        )
+        return buffer.getvalue().encode(self.charset)
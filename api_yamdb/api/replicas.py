@@ -0,0 +1,95 @@
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import CACHE_PREFIX, get_cache
+
+# База для чтения в текущем запросе. Вне запросов (команды, shell,
+# миграции) чтение идет с основной базы.
+_read_database = ContextVar('read_database', default=DEFAULT_DB_ALIAS)
+_replica_counter = itertools.count()
+
+
+def next_replica():
+    """
+    Очередная реплика из DATABASE_REPLICAS по кругу или None, если
+    реплики не настроены.
+    """
+    replicas = settings.DATABASE_REPLICAS
+    if not replicas:
+        return None
+    return replicas[next(_replica_counter) % len(replicas)]
+
+
+@contextmanager
+def read_from(alias):
+    token = _read_database.set(alias)
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+def _pin_key(user_id):
+    return f'{CACHE_PREFIX}:primary:{user_id}'
+
+
+def pin_to_primary(user_id):
+    """
+    Направляет чтение пользователя на основную базу на
+    READ_AFTER_WRITE_SECONDS секунд, чтобы он видел свои изменения,
+    пока реплики их догоняют.
+    """
+    get_cache().set(
+        _pin_key(user_id), True, settings.READ_AFTER_WRITE_SECONDS)
+
+
+def is_pinned_to_primary(user_id):
+    return get_cache().get(_pin_key(user_id)) is not None
+
+
+def get_token_user_id(request):
+    """
+    id пользователя из JWT в заголовке запроса без обращения к базе,
+    None для анонимных запросов и неверных токенов.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+    try:
+        raw_token = authentication.get_raw_token(header)
+        if raw_token is None:
+            return None
+        token = authentication.get_validated_token(raw_token)
+    except AuthenticationFailed:
+        return None
+    return token.get(api_settings.USER_ID_CLAIM)
+
+
+class ReplicaRouter:
+    """
+    Роутер баз данных: запись всегда в основную базу, чтение - в базу,
+    выбранную для текущего запроса ReplicaRoutingMiddleware. Реплики
+    получают схему репликацией, поэтому миграции на них не выполняются.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_database.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -4,9 +4,12 @@ from django.shortcuts import get_object_or_404
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleStats)
 from users.models import User
 
+TITLE_EXISTS_MESSAGE = 'Произведение уже в базе'
+
 
 class UsersSerializer(serializers.ModelSerializer):
     """
@@ -100,8 +103,9 @@ class TitleListSerializer(serializers.ModelSerializer):
     """
     Сериализатор модели Title, вызывается при GET запросе списка или
     конкретного обьекта поля genre и category вложенные сериализаторы,
-    поле rating получается подсчетом среднего значения
-    поля score из модели Review.
+    поле rating берется из денормализованных полей модели Title
+    без агрегации по отзывам, review_count - число отзывов
+    (rating_count).
     """
     genre = GenreSerializer(
         many=True,
@@ -109,6 +113,10 @@ class TitleListSerializer(serializers.ModelSerializer):
     )
     category = CategorySerializer(read_only=True)
     rating = serializers.FloatField(read_only=True)
+    review_count = serializers.IntegerField(
+        source='rating_count',
+        read_only=True
+    )
 
     class Meta:
         fields = (
@@ -116,6 +124,7 @@ class TitleListSerializer(serializers.ModelSerializer):
             'name',
             'year',
             'rating',
+            'review_count',
             'description',
             'genre',
             'category',
@@ -123,13 +132,59 @@ class TitleListSerializer(serializers.ModelSerializer):
         model = Title
 
 
+def stats_representation(rating_count, rating_sum, histogram):
+    """
+    Статистика оценок произведения: число отзывов, сумма оценок и
+    число отзывов с каждой оценкой от 1 до 10.
+    """
+    return {
+        'count': rating_count,
+        'sum': rating_sum,
+        'histogram': {
+            str(score): histogram.get(score) or 0
+            for score in TitleStats.SCORES
+        },
+    }
+
+
+class TitleStatsField(serializers.Field):
+    """
+    Поле статистики оценок: счетчики берутся из произведения,
+    распределение - из связанной строки TitleStats.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, title):
+        try:
+            histogram = title.stats.histogram
+        except TitleStats.DoesNotExist:
+            histogram = {}
+        return stats_representation(
+            title.rating_count, title.rating_sum, histogram)
+
+
+class TitleDetailSerializer(TitleListSerializer):
+    """
+    Сериализатор модели Title для GET запроса конкретного обьекта:
+    поля списка и статистика оценок.
+    """
+    stats = TitleStatsField()
+
+    class Meta(TitleListSerializer.Meta):
+        fields = TitleListSerializer.Meta.fields + ('stats',)
+
+
 class TitleCreateSerializer(serializers.ModelSerializer):
     """
     Сериализатор модели Title, вызывается при обращении к
     конкретному обьекту или изменении данных,
     поля genre и category берут slug значения из соответсвующих
-    моделей, поле rating получается подсчетом среднего значения
-    поля rating из модели Review, проводится валидация поля
+    моделей, поле rating берется из денормализованных полей
+    модели Title, проводится валидация поля
     year исключая передачу года выше текущего.
     """
     genre = serializers.SlugRelatedField(
@@ -159,7 +214,7 @@ class TitleCreateSerializer(serializers.ModelSerializer):
             UniqueTogetherValidator(
                 queryset=Title.objects.all(),
                 fields=['name', ],
-                message='Произведение уже в базе',
+                message=TITLE_EXISTS_MESSAGE,
             )
         ]
 
@@ -175,6 +230,32 @@ class TitleCreateSerializer(serializers.ModelSerializer):
         return value
 
 
+class TitleBulkSerializer(TitleCreateSerializer):
+    """
+    Сериализатор элемента пакетного создания произведений: проверяет
+    только поля элемента, существование жанров и категорий и
+    уникальность названия проверяются для всего пакета сразу.
+    """
+    genre = serializers.ListField(child=serializers.SlugField())
+    category = serializers.SlugField()
+
+    class Meta(TitleCreateSerializer.Meta):
+        validators = []
+
+
+class ReviewImportSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор элемента пакетного импорта отзывов: произведение
+    задается id, автор - username.
+    """
+    title = serializers.IntegerField()
+    author = serializers.CharField(max_length=150)
+
+    class Meta:
+        fields = ('title', 'author', 'text', 'score')
+        model = Review
+
+
 class ReviewSerializer(serializers.ModelSerializer):
     """
     Сериализатор модели Review, вызывается при обращении к
@@ -216,7 +297,10 @@ class ReviewSerializer(serializers.ModelSerializer):
         return data
 
     class Meta:
-        fields = '__all__'
+        fields = (
+            'id', 'title', 'author', 'pub_date', 'text', 'score',
+            'comment_count',
+        )
         model = Review
 
 
@@ -236,5 +320,5 @@ class CommentSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = '__all__'
+        fields = ('id', 'review', 'author', 'pub_date', 'text')
         model = Comment
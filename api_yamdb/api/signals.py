@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Category, Genre
+from users.models import User
+
+from .authentication import invalidate_cached_user
+from .cache import bump_generation
+
+CACHE_NAMESPACES = {
+    Category: 'categories',
+    Genre: 'genres',
+}
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_catalog_cache(sender, **kwargs):
+    """
+    Сбрасывает кэш списков категорий и жанров при любом изменении,
+    в том числе сделанном через админку.
+    """
+    bump_generation(CACHE_NAMESPACES[sender])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    """
+    Сбрасывает закэшированного при аутентификации пользователя, чтобы
+    смена роли через UsersViewSet или users/me/ применялась сразу.
+    """
+    invalidate_cached_user(instance.pk)
@@ -0,0 +1,187 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_PREFIX = 'throttle'
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Блокировка корзины в общем кэше: время жизни на случай падения
+# процесса, число попыток и пауза между ними. Попыток немного: занятая
+# корзина означает поток запросов одного клиента, и ждать ее нельзя
+# за счет потоков, обслуживающих остальных.
+LOCK_TIMEOUT = 1
+LOCK_ATTEMPTS = 3
+LOCK_DELAY = 0.005
+
+LOCAL_BUCKETS_MAX = 10000
+
+_local_buckets = OrderedDict()
+_local_lock = threading.Lock()
+
+
+def get_throttle_cache():
+    return caches[settings.THROTTLE_CACHE_ALIAS]
+
+
+def parse_rate(rate):
+    """
+    Лимит в формате DRF 'N/период' (s, m, h, d): емкость корзины N
+    жетонов, которые восполняются равномерно за период.
+    """
+    if rate is None:
+        return None
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+def take_token(state, now, capacity, period):
+    """
+    Берет жетон из корзины. Возвращает новое состояние
+    (жетоны, время) и сколько секунд ждать следующего жетона, 0 - если
+    жетон выдан.
+    """
+    refill = capacity / period
+    if state is None:
+        tokens = capacity
+    else:
+        tokens, updated = state
+        tokens = min(capacity, tokens + (now - updated) * refill)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / refill
+
+
+def _take_local(key, capacity, period):
+    with _local_lock:
+        state, wait = take_token(
+            _local_buckets.pop(key, None), time.time(), capacity, period)
+        _local_buckets[key] = state
+        if len(_local_buckets) > LOCAL_BUCKETS_MAX:
+            _local_buckets.popitem(last=False)
+    return wait
+
+
+def _take_shared(key, capacity, period):
+    """
+    Обновление корзины в общем кэше под блокировкой cache.add, которая
+    атомарна в locmem, memcached и Redis. Если блокировку взять не
+    удалось, жетон не выдается: время ожидания считается по текущему
+    состоянию корзины, а если жетоны в ней есть - по времени
+    восполнения одного жетона.
+    """
+    cache = get_throttle_cache()
+    lock = f'{key}:lock'
+    for _ in range(LOCK_ATTEMPTS):
+        if cache.add(lock, 1, timeout=LOCK_TIMEOUT):
+            break
+        time.sleep(LOCK_DELAY)
+    else:
+        _, wait = take_token(cache.get(key), time.time(), capacity, period)
+        return wait or period / capacity
+    try:
+        state, wait = take_token(
+            cache.get(key), time.time(), capacity, period)
+        cache.set(key, state, timeout=period)
+    finally:
+        cache.delete(lock)
+    return wait
+
+
+def take(key, capacity, period):
+    """
+    Берет жетон из корзины key и возвращает время ожидания в секундах.
+    Корзины хранятся в общем кэше, чтобы лимит действовал на все
+    процессы; только если кэш недоступен, используется корзина
+    текущего процесса.
+    """
+    try:
+        return _take_shared(key, capacity, period)
+    except Exception:
+        logger.warning('Кэш лимитов недоступен', exc_info=True)
+        return _take_local(key, capacity, period)
+
+
+def reset_local_buckets():
+    with _local_lock:
+        _local_buckets.clear()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Ограничение частоты запросов корзиной жетонов. Лимит берется из
+    DEFAULT_THROTTLE_RATES по ключу '<throttle_scope>_<kind>', где
+    throttle_scope - атрибут представления. Атрибут представления
+    throttle_methods ограничивает проверку методами запроса.
+    """
+    kind = None
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_ident_value(self, request, view):
+        raise NotImplementedError('.get_ident_value() must be overridden')
+
+    def get_rate(self, view):
+        key = f'{view.throttle_scope}_{self.kind}'
+        try:
+            return api_settings.DEFAULT_THROTTLE_RATES[key]
+        except KeyError:
+            raise ImproperlyConfigured(
+                f'Не задан лимит запросов для "{key}"')
+
+    def allow_request(self, request, view):
+        if getattr(view, 'throttle_scope', None) is None:
+            return True
+        methods = getattr(view, 'throttle_methods', None)
+        if methods is not None and request.method not in methods:
+            return True
+        rate = parse_rate(self.get_rate(view))
+        ident = self.get_ident_value(request, view)
+        if rate is None or ident is None:
+            return True
+        digest = hashlib.sha1(str(ident).encode()).hexdigest()
+        key = f'{THROTTLE_PREFIX}:{view.throttle_scope}:{self.kind}:{digest}'
+        self.wait_seconds = take(key, *rate)
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class AddressBucketThrottle(TokenBucketThrottle):
+    """
+    Корзина на IP-адрес клиента: последний адрес X-Forwarded-For,
+    добавленный доверенным прокси (NUM_PROXIES), без прокси -
+    REMOTE_ADDR.
+    """
+    kind = 'ip'
+
+    def get_ident_value(self, request, view):
+        return self.get_ident(request)
+
+
+class UserBucketThrottle(TokenBucketThrottle):
+    """
+    Корзина на пользователя: авторизованного, а для анонимных запросов
+    авторизации - на username из тела запроса.
+    """
+    kind = 'user'
+
+    def get_ident_value(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return request.user.pk
+        data = request.data
+        username = data.get('username') if hasattr(data, 'get') else None
+        if not username:
+            return None
+        return f'username:{username}'
@@ -1,32 +1,43 @@
 import uuid
 
-from django.core.mail import EmailMessage
-from django.db.models import Avg
+from django.core.exceptions import ValidationError
+from django.db.models import Max
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, permissions, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import (IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet
-from reviews.models import Category, Genre, Review, Title
-from users.models import User
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import OutgoingEmail, User
 
+from .bulk import (ReviewBulkCreator, TitleBulkCreator, bulk_status,
+                   check_bulk_payload)
+from .cache import CachedListMixin
+from .conditional import ConditionalGetMixin
+from .export import ExportView
+from .fast_serializers import (CommentFastSerializer, FastReadMixin,
+                               ReviewFastSerializer, TitleDetailFastSerializer,
+                               TitleFastSerializer, requested_reviews)
 from .filters import TitleFilters
-from .paginations import CommentsPaginator
+from .optimization import QueryOptimizationMixin
+from .paginations import CommentsPaginator, ReviewsPaginator, TitlesPaginator
 from .permissions import AdminOnly, AdminOrReadOnly, IsAdminOrAuthorOnly
 from .serializers import (CategorySerializer, CommentSerializer,
                           GenreSerializer, GetTokenSerializer,
                           NotAdminSerializer, ReviewSerializer,
                           SignUpSerializer, TitleCreateSerializer,
-                          TitleListSerializer, UsersSerializer)
+                          TitleDetailSerializer, TitleListSerializer,
+                          UsersSerializer)
+from .throttling import AddressBucketThrottle, UserBucketThrottle
 
 
-class UsersViewSet(viewsets.ModelViewSet):
+class UsersViewSet(QueryOptimizationMixin, viewsets.ModelViewSet):
     """
     Класс обрабатывает запросы  GET, PATCH от авторизованных пользователей
     на просмотр или изменение данных своей учетной записи, а также обрабатывает
@@ -45,16 +56,21 @@ class UsersViewSet(viewsets.ModelViewSet):
         url_path='me'
     )
     def get_current_user_info(self, request):
-        serializer = UsersSerializer(request.user)
+        # В request.user из кэша аутентификации есть только поля для
+        # проверки прав, профиль тогда читается одним запросом.
+        user = request.user
+        if user.get_deferred_fields():
+            user = self.get_queryset().get(pk=user.pk)
+        serializer = UsersSerializer(user)
         if request.method == 'PATCH':
-            if request.user.is_admin:
+            if user.is_admin:
                 serializer = UsersSerializer(
-                    request.user,
+                    user,
                     data=request.data,
                     partial=True)
             else:
                 serializer = NotAdminSerializer(
-                    request.user,
+                    user,
                     data=request.data,
                     partial=True)
             serializer.is_valid(raise_exception=True)
@@ -67,7 +83,10 @@ class APIGetToken(APIView):
     """
     Класс обрабатывает запросы POST от любого пользователя, осуществляет
     выдачу JWT-токена в обмен на валидные username и confirmation code.
+    Число попыток ограничено на IP-адрес и на username.
     """
+    throttle_classes = (AddressBucketThrottle, UserBucketThrottle)
+    throttle_scope = 'token'
 
     def post(self, request):
         serializer = GetTokenSerializer(data=request.data)
@@ -92,19 +111,14 @@ class APISignup(APIView):
     """
     Класс обрабатывает запросы POST от любого пользователя, выполняет
     валидацию уникальности полей email и username. После валидации
-    пользователю на почту высылается подтверждающий код.
+    письмо с подтверждающим кодом ставится в очередь исходящих писем,
+    которую разбирает команда send_emails. Число регистраций ограничено
+    на IP-адрес и на username.
     """
 
     permission_classes = (permissions.AllowAny,)
-
-    @staticmethod
-    def send_email(data):
-        email = EmailMessage(
-            subject=data['email_subject'],
-            body=data['email_body'],
-            to=[data['to_email']]
-        )
-        email.send()
+    throttle_classes = (AddressBucketThrottle, UserBucketThrottle)
+    throttle_scope = 'signup'
 
     def post(self, request):
         serializer = SignUpSerializer(data=request.data)
@@ -117,19 +131,20 @@ class APISignup(APIView):
             email=email,
             defaults={'confirmation_code': confirmation_code}
         )
-        email_body = (
-            f'Код подтвержения для доступа к API: {user[0].confirmation_code}'
+        OutgoingEmail.objects.enqueue(
+            to_email=user[0].email,
+            subject='Код подтвержения для доступа к API.',
+            body=(
+                'Код подтвержения для доступа к API: '
+                f'{user[0].confirmation_code}'
+            ),
         )
-        data = {
-            'email_body': email_body,
-            'to_email': user[0].email,
-            'email_subject': 'Код подтвержения для доступа к API.'
-        }
-        self.send_email(data)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class CategoryViewSet(mixins.CreateModelMixin,
+class CategoryViewSet(CachedListMixin,
+                      QueryOptimizationMixin,
+                      mixins.CreateModelMixin,
                       mixins.DestroyModelMixin,
                       mixins.ListModelMixin,
                       GenericViewSet):
@@ -138,8 +153,9 @@ class CategoryViewSet(mixins.CreateModelMixin,
     остальные методы POST, DELETE доступны только
     Администратору, обращение к конкретному обьекту
     происходит через уникальный slug. Возможен поиск
-    через параметр name
+    через параметр name. Ответы списка кэшируются.
     """
+    cache_namespace = 'categories'
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = (AdminOrReadOnly,)
@@ -148,7 +164,9 @@ class CategoryViewSet(mixins.CreateModelMixin,
     lookup_field = 'slug'
 
 
-class GenreViewSet(mixins.CreateModelMixin,
+class GenreViewSet(CachedListMixin,
+                   QueryOptimizationMixin,
+                   mixins.CreateModelMixin,
                    mixins.DestroyModelMixin,
                    mixins.ListModelMixin,
                    GenericViewSet):
@@ -157,8 +175,9 @@ class GenreViewSet(mixins.CreateModelMixin,
     остальные методы POST, DELETE доступны только
     Администратору, обращение к конкретному обьекту
     происходит через уникальный slug. Возможен поиск
-    через параметр name
+    через параметр name. Ответы списка кэшируются.
     """
+    cache_namespace = 'genres'
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = (AdminOrReadOnly,)
@@ -167,19 +186,23 @@ class GenreViewSet(mixins.CreateModelMixin,
     lookup_field = 'slug'
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(QueryOptimizationMixin, ConditionalGetMixin,
+                   FastReadMixin, viewsets.ModelViewSet):
     """
     Класс обрабатывает запросы GET от любого пользователя,
     остальные методы POST, PUT, PATCH, DELETE доступны только
-    Администратору, реализован стандартный метод паджинации.
+    Администратору, реализован стандартный метод паджинации,
+    курсорная пагинация доступна через параметр cursor.
+    Поддерживаются условные запросы (ETag, Last-Modified), чтение
+    сериализуется из values() быстрым сериализатором, ?expand=reviews[:N]
+    встраивает последние отзывы. POST со списком создает произведения
+    пакетом.
     """
 
-    queryset = Title.objects.prefetch_related(
-        'category', 'genre').annotate(
-        rating=Avg('reviews__score')
-    ).order_by('-id')
+    queryset = Title.objects.order_by('-id')
+    fast_serializer_class = TitleFastSerializer
     permission_classes = (AdminOrReadOnly,)
-    pagination_class = PageNumberPagination
+    pagination_class = TitlesPaginator
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilters
 
@@ -187,44 +210,183 @@ class TitleViewSet(viewsets.ModelViewSet):
         """
         Выбор сериализатора в зависимости от вида запроса
         """
-        if self.action in ('list', 'retrieve'):
+        if self.action == 'list':
             return TitleListSerializer
+        if self.action == 'retrieve':
+            return TitleDetailSerializer
         return TitleCreateSerializer
 
+    def get_fast_serializer_class(self):
+        if self.action == 'retrieve':
+            return TitleDetailFastSerializer
+        return super().get_fast_serializer_class()
+
+    def get_fast_serializer_kwargs(self, fast_serializer_class):
+        kwargs = super().get_fast_serializer_kwargs(fast_serializer_class)
+        kwargs['reviews'] = requested_reviews(self.request)
+        return kwargs
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    def get_list_validators(self):
+        """
+        Последние дата изменения и id произведений из базы (по индексам,
+        без COUNT), а не поколение кэша, которое не видит изменений из
+        других процессов при локальном кэше и из команд управления. Дату
+        изменения обновляют сигналы отзывов, комментариев, категорий и
+        жанров, а удаление произведения - у последнего из оставшихся,
+        поэтому она учитывает и вложенные данные, в том числе отзывы из
+        ?expand.
+        """
+        state = Title.objects.order_by().aggregate(
+            modified=Max('modified'), last_id=Max('id'))
+        return (state['modified'], state['last_id']), state['modified']
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        check_bulk_payload(request.data)
+        results = TitleBulkCreator(request.data).create()
+        return Response(results, status=bulk_status(results))
+
+    @action(detail=True, methods=['get'])
+    def stats(self, request, pk=None):
+        """
+        Статистика оценок произведения (число отзывов, сумма и
+        распределение оценок) одним запросом, без выборки отзывов.
+        """
+        try:
+            row = self.get_queryset().filter(pk=pk).values(
+                'rating_count', 'rating_sum',
+                *TitleDetailFastSerializer.stats_values,
+            ).first()
+        except (TypeError, ValueError, ValidationError):
+            row = None
+        if row is None:
+            raise Http404
+        return Response(TitleDetailFastSerializer.stats(row))
+
+
+class ReviewViewSet(QueryOptimizationMixin, ConditionalGetMixin,
+                    FastReadMixin, viewsets.ModelViewSet):
     """
     Класс обрабатывает запросы GET от любого пользователя, POST запросы
     доступны только авторизованным пользователям. Методы  PATCH,
     DELETE доступны только автору отзыва, модератору или админу,
+    курсорная пагинация доступна через параметр cursor.
+    Поддерживаются условные запросы (ETag, Last-Modified), чтение
+    сериализуется из values() быстрым сериализатором, частота создания
+    ограничена на IP-адрес и на пользователя.
     """
     serializer_class = ReviewSerializer
+    fast_serializer_class = ReviewFastSerializer
     permission_classes = [IsAdminOrAuthorOnly, IsAuthenticatedOrReadOnly]
+    throttle_classes = (AddressBucketThrottle, UserBucketThrottle)
+    throttle_scope = 'write'
+    throttle_methods = ('POST',)
+    pagination_class = ReviewsPaginator
+
+    def get_title(self):
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, pk=self.kwargs.get('title_id'))
+        return self._title
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        return self.get_title().reviews.all()
+
+    def get_list_validators(self):
+        modified = self.get_title().modified
+        return (modified,), modified
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author=self.request.user, title=self.get_title())
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(QueryOptimizationMixin, ConditionalGetMixin,
+                     FastReadMixin, viewsets.ModelViewSet):
     """
     Класс обрабатывает запросы GET от любого пользователя, POST запросы
     доступны только авторизованным пользователям. Методы  PATCH,
     DELETE доступны только автору комментария, модератору или админу,
-    реализован стандартный метод паджинации.
+    реализован стандартный метод паджинации,
+    курсорная пагинация доступна через параметр cursor.
+    Поддерживаются условные запросы (ETag, Last-Modified), чтение
+    сериализуется из values() быстрым сериализатором, частота создания
+    ограничена на IP-адрес и на пользователя.
     """
     serializer_class = CommentSerializer
+    fast_serializer_class = CommentFastSerializer
     permission_classes = [IsAdminOrAuthorOnly, IsAuthenticatedOrReadOnly]
+    throttle_classes = (AddressBucketThrottle, UserBucketThrottle)
+    throttle_scope = 'write'
+    throttle_methods = ('POST',)
     pagination_class = CommentsPaginator
 
+    def get_review(self):
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review, pk=self.kwargs.get('review_id'))
+        return self._review
+
     def get_queryset(self):
-        review = get_object_or_404(Review, pk=self.kwargs.get('review_id'))
-        return review.comments.all()
+        return self.get_review().comments.all()
+
+    def get_list_validators(self):
+        modified = self.get_review().modified
+        return (modified,), modified
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review, pk=self.kwargs.get('review_id'))
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_review())
+
+
+class ReviewExportView(ExportView):
+    """
+    Потоковая выгрузка отзывов для администратора: всех или одного
+    произведения (?title=), с фильтром ?since= по дате публикации.
+    """
+    export_name = 'reviews'
+    export_fields = {
+        'id': 'id',
+        'title_id': 'title_id',
+        'author': 'author__username',
+        'text': 'text',
+        'score': 'score',
+        'pub_date': 'pub_date',
+    }
+    export_filters = {'title': 'title_id'}
+
+    def get_queryset(self):
+        return Review.objects.all()
+
+
+class CommentExportView(ExportView):
+    """
+    Потоковая выгрузка комментариев для администратора: всех, одного
+    произведения (?title=) или отзыва (?review=), с фильтром ?since=.
+    """
+    export_name = 'comments'
+    export_fields = {
+        'id': 'id',
+        'review_id': 'review_id',
+        'title_id': 'review__title_id',
+        'author': 'author__username',
+        'text': 'text',
+        'pub_date': 'pub_date',
+    }
+    export_filters = {'title': 'review__title_id', 'review': 'review_id'}
+
+    def get_queryset(self):
+        return Comment.objects.all()
+
+
+class ReviewImportView(APIView):
+    """
+    Пакетный импорт отзывов администратором: POST со списком отзывов
+    {title, author, text, score}, результат возвращается по каждому
+    элементу.
+    """
+    permission_classes = (IsAuthenticated, AdminOnly)
+
+    def post(self, request):
+        check_bulk_payload(request.data)
+        results = ReviewBulkCreator(request.data).create()
+        return Response(results, status=bulk_status(results))
@@ -0,0 +1,49 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.wsgi import WsgiToAsgi
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+
+class ThreadPoolApplication:
+    """
+    ASGI-приложение поверх WSGI-приложения Django: Django 2.2 не умеет
+    асинхронные представления и ORM, поэтому запросы обрабатываются
+    WsgiToAsgi в пуле из ASGI_THREADS потоков, а прием тела запроса и
+    отдача ответа медленным клиентам идут в цикле событий сервера и не
+    занимают поток. Пул создается при старте (протокол lifespan), каждый
+    поток держит свое соединение с базой. Код Django упирается в GIL,
+    поэтому потоков нужно немного: по замерам bench_concurrency больше
+    4-8 на процесс только растят задержки.
+    """
+
+    def __init__(self, wsgi_application, threads):
+        self.application = WsgiToAsgi(wsgi_application)
+        self.threads = threads
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        else:
+            await self.application(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                asyncio.get_event_loop().set_default_executor(
+                    ThreadPoolExecutor(
+                        self.threads, thread_name_prefix='django'))
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+application = ThreadPoolApplication(
+    get_wsgi_application(),
+    threads=int(os.getenv('ASGI_THREADS', default=4)),
+)
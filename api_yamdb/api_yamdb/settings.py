@@ -19,12 +19,14 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'rest_framework_simplejwt',
-    'api',
-    'reviews',
+    'api.apps.ApiConfig',
+    'reviews.apps.ReviewsConfig',
     'users',
 ]
 
 MIDDLEWARE = [
+    'api.middleware.QueryInstrumentationMiddleware',
+    'api.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -66,6 +68,56 @@ DATABASES = {
     }
 }
 
+# Реплики только для чтения: DB_REPLICAS - через запятую HOST[:PORT]
+# реплик PostgreSQL (остальные параметры как у default), для SQLite -
+# пути к файлам баз.
+DATABASE_REPLICAS = []
+for replica in filter(None, map(str.strip, os.getenv(
+        'DB_REPLICAS', default='').split(','))):
+    alias = f'replica_{len(DATABASE_REPLICAS) + 1}'
+    DATABASES[alias] = dict(DATABASES['default'], TEST={'MIRROR': 'default'})
+    if DATABASES[alias]['ENGINE'].endswith('sqlite3'):
+        DATABASES[alias]['NAME'] = replica
+    else:
+        host, _, port = replica.partition(':')
+        DATABASES[alias]['HOST'] = host
+        DATABASES[alias]['PORT'] = port or DATABASES[alias]['PORT']
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+
+# Сколько секунд после изменения данных пользователь читает с основной
+# базы, пока реплики догоняют.
+READ_AFTER_WRITE_SECONDS = int(
+    os.getenv('READ_AFTER_WRITE_SECONDS', default=5))
+
+REPLICA_ROUTING_PREFIX = '/api/'
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='api_yamdb'),
+    }
+}
+
+API_CACHE_ALIAS = 'default'
+
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', default=300))
+
+THROTTLE_CACHE_ALIAS = 'default'
+
+# Число строк таблицы, начиная с которого пагинация API и админки берет
+# оценку планировщика или кэшированный COUNT(*) вместо точного подсчета.
+ESTIMATED_COUNT_THRESHOLD = int(
+    os.getenv('ESTIMATED_COUNT_THRESHOLD', default=100000))
+
+COUNT_CACHE_TIMEOUT = int(os.getenv('COUNT_CACHE_TIMEOUT', default=60))
+
+AUTH_USER_CACHE_TIMEOUT = int(
+    os.getenv('AUTH_USER_CACHE_TIMEOUT', default=60))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -99,7 +151,16 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
+    ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ),
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -107,6 +168,21 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS':
         'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 10,
+    # Число обратных прокси перед приложением (nginx из infra): адрес
+    # клиента для лимитов берется из X-Forwarded-For на этой глубине,
+    # адреса, подставленные самим клиентом, не учитываются.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default=1)),
+    # Лимиты корзин жетонов api.throttling по областям: регистрация,
+    # выдача токена и создание отзывов и комментариев, на IP-адрес и на
+    # пользователя. None отключает лимит.
+    'DEFAULT_THROTTLE_RATES': {
+        'signup_ip': '20/hour',
+        'signup_user': '3/hour',
+        'token_ip': '30/hour',
+        'token_user': '10/hour',
+        'write_ip': '120/min',
+        'write_user': '30/min',
+    },
 }
 
 SIMPLE_JWT = {
@@ -114,6 +190,12 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+EMAIL_BACKEND = os.getenv(
+    'EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+
+EMAIL_FILE_PATH = os.getenv(
+    'EMAIL_FILE_PATH', default=os.path.join(BASE_DIR, 'sent_emails'))
+
 EMAIL_HOST = 'smtp.gmail.com'
 
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
@@ -129,3 +211,47 @@ EMAIL_USE_SSL = False
 AUTH_USER_MODEL = 'users.User'
 
 PAGE_SIZE = 10
+
+# Наибольшее число объектов в пакетном POST (titles/, import/reviews/).
+BULK_MAX_ITEMS = 1000
+
+# Наибольшее N в ?expand=reviews[:N] для произведений.
+EXPAND_REVIEWS_MAX = 10
+
+QUERY_INSTRUMENTATION_PREFIX = '/api/'
+
+QUERY_BUDGET_STRICT = os.getenv('QUERY_BUDGET_STRICT', default='') == 'True'
+
+# Бюджеты SQL-запросов на обработку запроса к API (ViewSet.action),
+# с учетом запроса пользователя при промахе кэша JWT-аутентификации.
+# ?expand=reviews добавляет к произведениям запрос последних отзывов.
+QUERY_BUDGETS = {
+    'TitleViewSet.list': 5,
+    'TitleViewSet.retrieve': 5,
+    'TitleViewSet.stats': 2,
+    'CategoryViewSet.list': 3,
+    'GenreViewSet.list': 3,
+    'ReviewViewSet.list': 4,
+    'ReviewViewSet.retrieve': 4,
+    'CommentViewSet.list': 4,
+    'CommentViewSet.retrieve': 4,
+    'UsersViewSet.list': 3,
+    'UsersViewSet.get_current_user_info': 2,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.performance': {
+            'handlers': ['console'],
+            'level': os.getenv('API_PERFORMANCE_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+    },
+}
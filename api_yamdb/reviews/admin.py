@@ -1,10 +1,11 @@
 from django.contrib import admin
 
+from api.counting import EstimatedCountAdminMixin
 from reviews.models import Comment, Review, Genre, Category, Title
 
 
 @admin.register(Genre)
-class GenreAdmin(admin.ModelAdmin):
+class GenreAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     """Класс, формирующий админ-панель сайта, раздел: жанры."""
     list_display = (
         'name', 'slug',
@@ -15,7 +16,7 @@ class GenreAdmin(admin.ModelAdmin):
 
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     """Класс, формирующий админ-панель сайта, раздел: категории."""
     list_display = (
         'name', 'slug',
@@ -26,7 +27,7 @@ class CategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(Title)
-class TitleAdmin(admin.ModelAdmin):
+class TitleAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     """Класс, формирующий админ-панель сайта, раздел: Произведения."""
     list_display = (
         'name', 'year', 'description',
@@ -41,7 +42,7 @@ class TitleAdmin(admin.ModelAdmin):
         return obj.mtm_field.through.genre
 
 
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     """Класс, формирующий админ-панель сайта, раздел: отзывы."""
     list_display = (
         'title',
@@ -54,7 +55,7 @@ class ReviewAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     """Класс, формирующий админ-панель сайта, раздел: комментарии."""
     list_display = (
         'review',
@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from reviews.models import Comment, Review, Title
+from reviews.signals import id_batches
+
+
+class Command(BaseCommand):
+    """
+    Пересчитывает денормализованное число комментариев отзывов
+    (comment_count) одним сгруппированным запросом по комментариям.
+    Число отзывов произведения (rating_count) пересчитывает
+    rebuild_ratings. С ключом --check только сверяет значения и
+    завершается с ошибкой при расхождениях.
+    """
+    help = 'Пересчитывает и проверяет число комментариев отзывов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить счетчики, ничего не изменяя.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Размер пачки при сохранении исправленных значений.',
+        )
+
+    def handle(self, *args, **options):
+        counts = dict(Comment.objects.values_list('review').annotate(
+            count=Count('id')).order_by())
+        stale = []
+        now = timezone.now()
+        reviews = Review.objects.only('comment_count').order_by()
+        for review in reviews.iterator():
+            expected = counts.get(review.pk, 0)
+            if review.comment_count != expected:
+                review.comment_count = expected
+                review.modified = now
+                stale.append(review)
+
+        if options['check']:
+            if stale:
+                raise CommandError(
+                    f'Число комментариев не совпадает у {len(stale)} '
+                    'отзывов: '
+                    + ', '.join(str(review.pk) for review in stale[:20])
+                )
+            self.stdout.write(self.style.SUCCESS('Счетчики в порядке.'))
+            return
+
+        with transaction.atomic():
+            Review.objects.bulk_update(
+                stale, ('comment_count', 'modified'),
+                batch_size=options['batch_size'])
+            # Даты изменения входят в ETag отзывов и произведений.
+            for batch in id_batches([review.pk for review in stale]):
+                Title.objects.filter(reviews__in=batch).update(modified=now)
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано число комментариев {len(stale)} отзывов.'))
@@ -0,0 +1,111 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from reviews.models import Review, Title, TitleStats
+from reviews.signals import id_batches, score_histograms
+
+
+class Command(BaseCommand):
+    """
+    Пересчитывает денормализованный рейтинг произведений (rating_sum,
+    rating_count) и распределение оценок TitleStats по таблице отзывов
+    одним сгруппированным запросом. С ключом --check только сверяет
+    значения и завершается с ошибкой при расхождениях.
+    """
+    help = 'Пересчитывает и проверяет рейтинг произведений.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить рейтинг, ничего не изменяя.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Размер пачки при сохранении исправленных значений.',
+        )
+
+    def handle(self, *args, **options):
+        histograms = score_histograms(Review.objects.all())
+        stale_titles = self.stale_titles(histograms)
+        stale_stats, missing_stats = self.stale_stats(histograms)
+        stale_ids = sorted(
+            {title.pk for title in stale_titles}
+            | {stats.title_id for stats in stale_stats + missing_stats}
+        )
+
+        if options['check']:
+            if stale_ids:
+                raise CommandError(
+                    f'Рейтинг не совпадает у {len(stale_ids)} произведений: '
+                    + ', '.join(str(pk) for pk in stale_ids[:20])
+                )
+            self.stdout.write(self.style.SUCCESS('Рейтинг в порядке.'))
+            return
+
+        batch_size = options['batch_size']
+        with transaction.atomic():
+            Title.objects.bulk_update(
+                stale_titles,
+                ('rating_sum', 'rating_count'),
+                batch_size=batch_size,
+            )
+            TitleStats.objects.bulk_update(
+                stale_stats,
+                [TitleStats.score_field(score) for score in TitleStats.SCORES],
+                batch_size=batch_size,
+            )
+            TitleStats.objects.bulk_create(missing_stats, batch_size=min(
+                batch_size,
+                connection.ops.bulk_batch_size(
+                    TitleStats._meta.concrete_fields, missing_stats),
+            ))
+            # Дата изменения входит в ETag произведений.
+            now = timezone.now()
+            for batch in id_batches(stale_ids):
+                Title.objects.filter(pk__in=batch).update(modified=now)
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитан рейтинг {len(stale_ids)} произведений.'))
+
+    def stale_titles(self, histograms):
+        stale = []
+        titles = Title.objects.only('rating_sum', 'rating_count').order_by()
+        for title in titles.iterator():
+            histogram = histograms.get(title.pk, {})
+            expected = (
+                sum(score * count for score, count in histogram.items()),
+                sum(histogram.values()),
+            )
+            if (title.rating_sum, title.rating_count) != expected:
+                title.rating_sum, title.rating_count = expected
+                stale.append(title)
+        return stale
+
+    def stale_stats(self, histograms):
+        """
+        Строки TitleStats с неверным распределением и недостающие строки
+        для произведений с отзывами.
+        """
+        stale = []
+        existing = set()
+        for stats in TitleStats.objects.order_by().iterator():
+            existing.add(stats.title_id)
+            histogram = histograms.get(stats.title_id, {})
+            expected = {
+                score: histogram.get(score, 0) for score in TitleStats.SCORES}
+            if stats.histogram != expected:
+                for score, count in expected.items():
+                    setattr(stats, TitleStats.score_field(score), count)
+                stale.append(stats)
+        missing = [
+            TitleStats(title_id=title_id, **{
+                TitleStats.score_field(score): count
+                for score, count in histogram.items()
+            })
+            for title_id, histogram in histograms.items()
+            if title_id not in existing
+        ]
+        return stale, missing
@@ -0,0 +1,35 @@
+# Generated by Django 2.2.16 on 2026-10-17 02:37
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_title_rating(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    totals = Review.objects.values('title').annotate(
+        total=Sum('score'), count=Count('id')).order_by()
+    for row in totals:
+        Title.objects.filter(pk=row['title']).update(
+            rating_sum=row['total'], rating_count=row['count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_title_rating, migrations.RunPython.noop),
+    ]
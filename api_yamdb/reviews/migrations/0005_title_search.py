@@ -0,0 +1,144 @@
+from django.db import migrations
+
+POSTGRESQL_FORWARD = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'ALTER TABLE reviews_title ADD COLUMN search_vector tsvector',
+    """
+    CREATE FUNCTION reviews_title_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'A')
+            || setweight(
+                to_tsvector('simple', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER reviews_title_search_vector
+    BEFORE INSERT OR UPDATE OF name, description ON reviews_title
+    FOR EACH ROW EXECUTE PROCEDURE reviews_title_search_vector_update()
+    """,
+    'UPDATE reviews_title SET name = name',
+    """
+    CREATE INDEX reviews_title_search_idx
+    ON reviews_title USING GIN (search_vector)
+    """,
+    """
+    CREATE INDEX reviews_title_name_trgm_idx
+    ON reviews_title USING GIN (UPPER(name::text) gin_trgm_ops)
+    """,
+    """
+    CREATE INDEX reviews_category_name_trgm_idx
+    ON reviews_category USING GIN (UPPER(name::text) gin_trgm_ops)
+    """,
+    """
+    CREATE INDEX reviews_genre_name_trgm_idx
+    ON reviews_genre USING GIN (UPPER(name::text) gin_trgm_ops)
+    """,
+]
+
+POSTGRESQL_BACKWARD = [
+    'DROP INDEX IF EXISTS reviews_genre_name_trgm_idx',
+    'DROP INDEX IF EXISTS reviews_category_name_trgm_idx',
+    'DROP INDEX IF EXISTS reviews_title_name_trgm_idx',
+    'DROP INDEX IF EXISTS reviews_title_search_idx',
+    'DROP TRIGGER IF EXISTS reviews_title_search_vector ON reviews_title',
+    'DROP FUNCTION IF EXISTS reviews_title_search_vector_update()',
+    'ALTER TABLE reviews_title DROP COLUMN IF EXISTS search_vector',
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE reviews_title_fts USING fts5(
+        name, description,
+        content='reviews_title', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER reviews_title_fts_insert AFTER INSERT ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts (rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER reviews_title_fts_delete AFTER DELETE ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts
+            (reviews_title_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER reviews_title_fts_update
+    AFTER UPDATE OF name, description ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts
+            (reviews_title_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO reviews_title_fts (rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    "INSERT INTO reviews_title_fts (reviews_title_fts) VALUES ('rebuild')",
+    """
+    CREATE INDEX reviews_title_name_nocase_idx
+    ON reviews_title (name COLLATE NOCASE)
+    """,
+    """
+    CREATE INDEX reviews_category_name_nocase_idx
+    ON reviews_category (name COLLATE NOCASE)
+    """,
+    """
+    CREATE INDEX reviews_genre_name_nocase_idx
+    ON reviews_genre (name COLLATE NOCASE)
+    """,
+]
+
+SQLITE_BACKWARD = [
+    'DROP INDEX IF EXISTS reviews_genre_name_nocase_idx',
+    'DROP INDEX IF EXISTS reviews_category_name_nocase_idx',
+    'DROP INDEX IF EXISTS reviews_title_name_nocase_idx',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_update',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_delete',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_insert',
+    'DROP TABLE IF EXISTS reviews_title_fts',
+]
+
+
+def sqlite_has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return ('ENABLE_FTS5',) in cursor.fetchall()
+
+
+def run_statements(forward):
+    def operation(apps, schema_editor):
+        connection = schema_editor.connection
+        if connection.vendor == 'postgresql':
+            statements = POSTGRESQL_FORWARD if forward else POSTGRESQL_BACKWARD
+        elif connection.vendor == 'sqlite' and sqlite_has_fts5(connection):
+            statements = SQLITE_FORWARD if forward else SQLITE_BACKWARD
+        else:
+            return
+        for statement in statements:
+            schema_editor.execute(statement, params=None)
+    return operation
+
+
+class Migration(migrations.Migration):
+    """
+    Индексы для поиска произведений: tsvector и триграммы в PostgreSQL,
+    FTS5 и индексы NOCASE в SQLite. Схема зависит от СУБД, поэтому
+    создается SQL-командами, а не полями модели.
+    """
+
+    dependencies = [
+        ('reviews', '0004_modified_timestamps'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_statements(True), run_statements(False)),
+    ]
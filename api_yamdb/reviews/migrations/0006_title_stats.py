@@ -0,0 +1,55 @@
+# Generated by Django 2.2.16 on 2026-10-17 03:05
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def fill_title_stats(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    TitleStats = apps.get_model('reviews', 'TitleStats')
+    histograms = defaultdict(dict)
+    rows = Review.objects.values_list('title', 'score').annotate(
+        count=Count('id')).order_by()
+    for title_id, score, count in rows:
+        histograms[title_id][f'score_{score}'] = count
+    TitleStats.objects.bulk_create(
+        [
+            TitleStats(title_id=title_id, **histogram)
+            for title_id, histogram in histograms.items()
+        ],
+        batch_size=50,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_title_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleStats',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='reviews.Title', verbose_name='Произведение')),
+                ('score_1', models.PositiveIntegerField(default=0, verbose_name='Оценок 1')),
+                ('score_2', models.PositiveIntegerField(default=0, verbose_name='Оценок 2')),
+                ('score_3', models.PositiveIntegerField(default=0, verbose_name='Оценок 3')),
+                ('score_4', models.PositiveIntegerField(default=0, verbose_name='Оценок 4')),
+                ('score_5', models.PositiveIntegerField(default=0, verbose_name='Оценок 5')),
+                ('score_6', models.PositiveIntegerField(default=0, verbose_name='Оценок 6')),
+                ('score_7', models.PositiveIntegerField(default=0, verbose_name='Оценок 7')),
+                ('score_8', models.PositiveIntegerField(default=0, verbose_name='Оценок 8')),
+                ('score_9', models.PositiveIntegerField(default=0, verbose_name='Оценок 9')),
+                ('score_10', models.PositiveIntegerField(default=0, verbose_name='Оценок 10')),
+            ],
+            options={
+                'verbose_name': 'Статистика оценок',
+                'verbose_name_plural': 'Статистика оценок',
+            },
+        ),
+        migrations.RunPython(fill_title_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.16 on 2026-10-17 03:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year', '-id'], name='title_year_id_idx'),
+        ),
+    ]
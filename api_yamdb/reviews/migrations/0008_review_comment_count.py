@@ -0,0 +1,37 @@
+# Generated by Django 2.2.16 on 2026-10-17 03:23
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_comment_counts(apps, schema_editor):
+    Comment = apps.get_model('reviews', 'Comment')
+    Review = apps.get_model('reviews', 'Review')
+    by_count = defaultdict(list)
+    rows = Comment.objects.values_list('review').annotate(
+        count=Count('id')).order_by()
+    for review_id, count in rows:
+        by_count[count].append(review_id)
+    for count, review_ids in by_count.items():
+        for start in range(0, len(review_ids), 500):
+            Review.objects.filter(
+                pk__in=review_ids[start:start + 500]
+            ).update(comment_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_title_year_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Число комментариев'),
+        ),
+        migrations.RunPython(fill_comment_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.16 on 2026-10-17 03:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_review_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['modified'], name='title_modified_idx'),
+        ),
+    ]
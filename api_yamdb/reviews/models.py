@@ -97,6 +97,20 @@ class Title(models.Model):
         related_name='title',
         verbose_name='Жанр'
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок'
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество оценок'
+    )
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
 
     class Meta:
         verbose_name = 'Произведение'
@@ -108,10 +122,108 @@ class Title(models.Model):
                 name='unique_title'
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=['year', '-id'],
+                name='title_year_id_idx'
+            ),
+            models.Index(
+                fields=['modified'],
+                name='title_modified_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def rating(self):
+        """
+        Средняя оценка произведения. Считается по денормализованным
+        полям rating_sum и rating_count, которые обновляются сигналами
+        при создании, изменении и удалении отзывов.
+        """
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
+
+class TitleStats(models.Model):
+    """
+    Распределение оценок произведения: число отзывов с каждой оценкой
+    от 1 до 10. Обновляется сигналами вместе с rating_sum и rating_count
+    произведения, пересчитывается командой rebuild_ratings. Строка
+    создается с первым отзывом, отсутствие строки означает нулевое
+    распределение.
+    """
+    SCORES = range(1, 11)
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Произведение'
+    )
+    score_1 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 1'
+    )
+    score_2 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 2'
+    )
+    score_3 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 3'
+    )
+    score_4 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 4'
+    )
+    score_5 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 5'
+    )
+    score_6 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 6'
+    )
+    score_7 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 7'
+    )
+    score_8 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 8'
+    )
+    score_9 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 9'
+    )
+    score_10 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 10'
+    )
+
+    class Meta:
+        verbose_name = 'Статистика оценок'
+        verbose_name_plural = 'Статистика оценок'
+
+    def __str__(self):
+        return str(self.title_id)
+
+    @staticmethod
+    def score_field(score):
+        return f'score_{score}'
+
+    @property
+    def histogram(self):
+        return {
+            score: getattr(self, self.score_field(score))
+            for score in self.SCORES
+        }
+
 
 class Review(models.Model):
     """
@@ -119,6 +231,8 @@ class Review(models.Model):
     оставлять отзывы на  произведения и выставлять оценки. Включает автора,
     название произведения, дату публикации, текст рецензии, оценку (1 до 10).
     Автор может оставить только один отзыв к каждому конкретному произведению.
+    Число комментариев comment_count обновляется сигналами комментариев,
+    пересчитывается командой rebuild_counters.
     """
     author = models.ForeignKey(
         User,
@@ -143,6 +257,15 @@ class Review(models.Model):
         verbose_name='Оценка',
         validators=(MaxValueValidator(10), MinValueValidator(1)),
     )
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Число комментариев'
+    )
 
     class Meta:
         verbose_name = 'Отзыв'
@@ -154,6 +277,25 @@ class Review(models.Model):
                 name='unique_title_author'
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', 'id'],
+                name='review_title_pub_date_idx'
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Запоминает произведение и оценку, загруженные из базы, чтобы при
+        сохранении скорректировать рейтинг произведения на разницу оценок.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_rating = (
+            instance.__dict__.get('title_id'),
+            instance.__dict__.get('score'),
+        )
+        return instance
 
     def __str__(self):
         return self.text
@@ -186,11 +328,21 @@ class Comment(models.Model):
         verbose_name='Комментарий',
         max_length=200
     )
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
 
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date', 'id'],
+                name='comment_review_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text
@@ -0,0 +1,77 @@
+import re
+
+from django.db import connections
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+
+_fts_tables = {}
+
+
+def _search_terms(query):
+    return re.findall(r'\w+', query)
+
+
+def _has_sqlite_fts(connection):
+    """
+    Проверяет, создана ли таблица FTS5 (ее нет, если SQLite собран без
+    FTS5). Результат запоминается для соединения.
+    """
+    key = (connection.alias, connection.settings_dict['NAME'])
+    if key not in _fts_tables:
+        _fts_tables[key] = (
+            'reviews_title_fts' in connection.introspection.table_names()
+        )
+    return _fts_tables[key]
+
+
+def search_titles(queryset, query):
+    """
+    Полнотекстовый поиск произведений по названию и описанию с
+    сортировкой по релевантности (аннотация search_rank).
+
+    PostgreSQL: tsvector с весами (название важнее описания), префиксный
+    поиск по словам и нечеткое совпадение названия по триграммам.
+    SQLite: таблица FTS5 и ранжирование bm25. В остальных случаях -
+    icontains без ранжирования.
+    """
+    terms = _search_terms(query)
+    if not terms:
+        return queryset
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+
+    if connection.vendor == 'postgresql':
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        return queryset.annotate(search_rank=RawSQL(
+            f"ts_rank({table}.search_vector, to_tsquery('simple', %s))"
+            f' + similarity(UPPER({table}.name::text), UPPER(%s))',
+            (tsquery, query),
+            output_field=FloatField(),
+        )).extra(
+            where=[
+                f"({table}.search_vector @@ to_tsquery('simple', %s)"
+                f' OR UPPER({table}.name::text) %% UPPER(%s))'
+            ],
+            params=[tsquery, query],
+        ).order_by('-search_rank', '-id')
+
+    if connection.vendor == 'sqlite' and _has_sqlite_fts(connection):
+        match = ' '.join('"{}"*'.format(term) for term in terms)
+        return queryset.annotate(search_rank=RawSQL(
+            'SELECT -bm25(reviews_title_fts, 10.0, 1.0) '
+            'FROM reviews_title_fts '
+            f'WHERE reviews_title_fts MATCH %s AND rowid = {table}.id',
+            (match,),
+            output_field=FloatField(),
+        )).extra(
+            where=[
+                f'{table}.id IN (SELECT rowid FROM reviews_title_fts '
+                'WHERE reviews_title_fts MATCH %s)'
+            ],
+            params=[match],
+        ).order_by('-search_rank', '-id')
+
+    condition = Q()
+    for term in terms:
+        condition &= Q(name__icontains=term) | Q(description__icontains=term)
+    return queryset.filter(condition)
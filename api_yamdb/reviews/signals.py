@@ -0,0 +1,265 @@
+from collections import defaultdict
+
+from django.db.models import Count, F
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleStats)
+
+# Число id в одном UPDATE ... WHERE id IN (...): SQLite ограничивает
+# число параметров запроса.
+UPDATE_BATCH = 500
+
+
+def id_batches(ids):
+    for start in range(0, len(ids), UPDATE_BATCH):
+        yield ids[start:start + UPDATE_BATCH]
+
+
+def score_histograms(reviews):
+    """
+    Распределение оценок по произведениям одним сгруппированным
+    запросом: {id произведения: {оценка: число отзывов}}.
+    """
+    histograms = defaultdict(dict)
+    rows = reviews.values_list('title', 'score').annotate(
+        count=Count('id')).order_by()
+    for title_id, score, count in rows:
+        histograms[title_id][score] = count
+    return histograms
+
+
+def refresh_title_rating(title_ids):
+    """
+    Пересчитывает денормализованный рейтинг и распределение оценок
+    указанных произведений одним сгруппированным запросом по отзывам.
+    """
+    title_ids = set(title_ids)
+    histograms = score_histograms(Review.objects.filter(title__in=title_ids))
+    for title_id in title_ids:
+        histogram = histograms.get(title_id, {})
+        Title.objects.filter(pk=title_id).update(
+            rating_sum=sum(
+                score * count for score, count in histogram.items()),
+            rating_count=sum(histogram.values()),
+            modified=timezone.now(),
+        )
+        TitleStats.objects.update_or_create(title_id=title_id, defaults={
+            TitleStats.score_field(score): histogram.get(score, 0)
+            for score in TitleStats.SCORES
+        })
+
+
+def _stats_values(score_counts, positive=False):
+    return {
+        TitleStats.score_field(score): count
+        for score, count in score_counts.items()
+        if count and (count > 0 or not positive)
+    }
+
+
+def _shift_title_totals(title_id, score_counts):
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=F('rating_sum') + sum(
+            score * count for score, count in score_counts.items()),
+        rating_count=F('rating_count') + sum(score_counts.values()),
+        modified=timezone.now(),
+    )
+
+
+def _shift_title_stats(title_id, score_counts):
+    changes = {
+        field: F(field) + count
+        for field, count in _stats_values(score_counts).items()
+    }
+    return not changes or TitleStats.objects.filter(
+        title_id=title_id).update(**changes)
+
+
+def _shift_title_rating(title_id, score_counts):
+    """
+    Сдвигает рейтинг и распределение оценок произведения:
+    score_counts - изменение числа отзывов по оценкам. Строка
+    TitleStats создается, только если число отзывов растет: при
+    каскадном удалении произведения она уже удалена, и создавать ее
+    заново нельзя.
+    """
+    _shift_title_totals(title_id, score_counts)
+    if _shift_title_stats(title_id, score_counts):
+        return
+    defaults = _stats_values(score_counts, positive=True)
+    if not defaults:
+        return
+    _, created = TitleStats.objects.get_or_create(
+        title_id=title_id, defaults=defaults)
+    if not created:
+        _shift_title_stats(title_id, score_counts)
+
+
+def shift_title_ratings(score_counts):
+    """
+    Учитывает в рейтинге отзывы, записанные без сигналов (bulk_create):
+    score_counts - число добавленных отзывов по парам
+    (id произведения, оценка), отрицательное для удаленных. Произведения
+    с одинаковым изменением рейтинга и распределения оценок обновляются
+    одним запросом, недостающие строки TitleStats создаются одним
+    bulk_create.
+    """
+    by_title = defaultdict(dict)
+    for (title_id, score), count in score_counts.items():
+        by_title[title_id][score] = count
+    existing = set(TitleStats.objects.filter(
+        title_id__in=by_title).values_list('title_id', flat=True))
+    totals = defaultdict(list)
+    stats = defaultdict(list)
+    missing = []
+    for title_id, title_counts in by_title.items():
+        totals[(
+            sum(score * count for score, count in title_counts.items()),
+            sum(title_counts.values()),
+        )].append(title_id)
+        if title_id in existing:
+            changes = tuple(sorted(_stats_values(title_counts).items()))
+            if changes:
+                stats[changes].append(title_id)
+        else:
+            missing.append(TitleStats(
+                title_id=title_id,
+                **_stats_values(title_counts, positive=True)))
+    now = timezone.now()
+    for (rating_sum, rating_count), title_ids in totals.items():
+        for batch in id_batches(title_ids):
+            Title.objects.filter(pk__in=batch).update(
+                rating_sum=F('rating_sum') + rating_sum,
+                rating_count=F('rating_count') + rating_count,
+                modified=now,
+            )
+    for changes, title_ids in stats.items():
+        for batch in id_batches(title_ids):
+            TitleStats.objects.filter(title_id__in=batch).update(**{
+                field: F(field) + count for field, count in changes})
+    TitleStats.objects.bulk_create(missing)
+
+
+def shift_comment_counts(comment_counts):
+    """
+    Учитывает комментарии, записанные без сигналов (bulk_create):
+    comment_counts - изменение числа комментариев по id отзывов. Отзывы
+    с одинаковым изменением обновляются одним запросом, вместе с датой
+    изменения отзывов и их произведений, от которых зависят ETag
+    списков комментариев и отзывов.
+    """
+    now = timezone.now()
+    by_count = defaultdict(list)
+    for review_id, count in comment_counts.items():
+        if count:
+            by_count[count].append(review_id)
+    for count, review_ids in by_count.items():
+        for batch in id_batches(review_ids):
+            Review.objects.filter(pk__in=batch).update(
+                comment_count=F('comment_count') + count, modified=now)
+            Title.objects.filter(reviews__in=batch).update(modified=now)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_review_save(sender, instance, created, raw, **kwargs):
+    """
+    Корректирует рейтинг и распределение оценок произведения при
+    создании или изменении отзыва и обновляет дату изменения
+    произведения, от которой зависит ETag списка отзывов.
+    При загрузке фикстур (raw) рейтинг не трогаем: его восстанавливает
+    команда rebuild_ratings.
+    """
+    if raw:
+        return
+    if created:
+        _shift_title_rating(instance.title_id, {instance.score: 1})
+    else:
+        old_title_id, old_score = getattr(
+            instance, '_loaded_rating', (None, None))
+        if old_title_id is None or old_score is None:
+            refresh_title_rating([instance.title_id])
+        elif old_title_id != instance.title_id:
+            _shift_title_rating(old_title_id, {old_score: -1})
+            _shift_title_rating(instance.title_id, {instance.score: 1})
+        else:
+            score_counts = defaultdict(int, {instance.score: 1})
+            score_counts[old_score] -= 1
+            _shift_title_rating(instance.title_id, score_counts)
+    instance._loaded_rating = (instance.title_id, instance.score)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_review_delete(sender, instance, **kwargs):
+    """
+    Уменьшает рейтинг произведения при удалении отзыва, в том числе
+    при каскадном удалении вместе с автором.
+    """
+    _shift_title_rating(instance.title_id, {instance.score: -1})
+
+
+def _update_review(review_id, comment_delta):
+    now = timezone.now()
+    changes = {'modified': now}
+    if comment_delta:
+        changes['comment_count'] = F('comment_count') + comment_delta
+    Review.objects.filter(pk=review_id).update(**changes)
+    Title.objects.filter(reviews=review_id).update(modified=now)
+
+
+@receiver(post_save, sender=Comment)
+def update_review_on_comment_save(sender, instance, created, raw, **kwargs):
+    """
+    Обновляет дату изменения отзыва и его произведения, от которых
+    зависят ETag списков комментариев и отзывов (в отзывах выводится
+    comment_count), и увеличивает число комментариев отзыва при
+    создании комментария. При загрузке фикстур (raw) число
+    восстанавливает команда rebuild_counters.
+    """
+    if raw:
+        return
+    _update_review(instance.review_id, 1 if created else 0)
+
+
+@receiver(post_delete, sender=Comment)
+def update_review_on_comment_delete(sender, instance, **kwargs):
+    """
+    Уменьшает число комментариев отзыва при удалении комментария, в том
+    числе при каскадном удалении вместе с автором.
+    """
+    _update_review(instance.review_id, -1)
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def touch_category_titles(sender, instance, **kwargs):
+    """
+    Категория выводится в представлении произведений, поэтому ее
+    изменение и удаление обновляет дату изменения произведений, от
+    которой зависят их ETag. При удалении даты обновляются до того, как
+    связь будет обнулена.
+    """
+    Title.objects.filter(category=instance).update(modified=timezone.now())
+
+
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def touch_genre_titles(sender, instance, **kwargs):
+    """
+    То же для жанров: дата изменения обновляется у произведений жанра
+    до удаления связей.
+    """
+    Title.objects.filter(genre=instance).update(modified=timezone.now())
+
+
+@receiver(post_delete, sender=Title)
+def touch_latest_title(sender, instance, **kwargs):
+    """
+    ETag списка произведений строится по последней дате изменения,
+    которую удаление не меняет, поэтому она обновляется у последнего из
+    оставшихся произведений.
+    """
+    latest = Title.objects.order_by('-modified').values('pk')[:1]
+    Title.objects.filter(pk__in=latest).update(modified=timezone.now())
@@ -1,9 +1,11 @@
 from django.contrib import admin
-from .models import User
+
+from api.counting import EstimatedCountAdminMixin
+from .models import OutgoingEmail, User
 
 
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
     """Класс, формирующий админ-панель сайта, раздел: пользователи."""
     list_display = (
         'username', 'email', 'first_name',
@@ -12,3 +14,15 @@ class UserAdmin(admin.ModelAdmin):
     search_fields = ('username', 'role',)
     list_filter = ('username',)
     empty_value_display = 'пустое поле'
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(EstimatedCountAdminMixin, admin.ModelAdmin):
+    """Класс, формирующий админ-панель сайта, раздел: исходящие письма."""
+    list_display = (
+        'to_email', 'subject', 'status', 'attempts',
+        'next_attempt_at', 'sent_at',
+    )
+    search_fields = ('to_email',)
+    list_filter = ('status',)
+    empty_value_display = 'пустое поле'
@@ -0,0 +1,108 @@
+import time
+from datetime import timedelta
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import FAILED, PENDING, SENT, OutgoingEmail
+
+
+class Command(BaseCommand):
+    """
+    Отправляет письма из очереди OutgoingEmail. Каждая пачка уходит через
+    одно соединение с почтовым сервером, неотправленные письма
+    откладываются с экспоненциальной задержкой, после max-attempts
+    попыток письмо помечается как failed.
+    """
+    help = 'Отправляет письма из очереди исходящих писем.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Число писем, отправляемых через одно соединение.',
+        )
+        parser.add_argument(
+            '--max-attempts', type=int, default=5,
+            help='Число попыток, после которого письмо не отправляется.',
+        )
+        parser.add_argument(
+            '--backoff', type=int, default=30,
+            help='Базовая задержка повторной отправки в секундах.',
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, ожидая новые письма.',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза в секундах между проверками пустой очереди.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            processed = self.send_batch(
+                options['batch_size'],
+                options['max_attempts'],
+                options['backoff'],
+            )
+            if processed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def send_batch(self, batch_size, max_attempts, backoff):
+        """
+        Отправляет одну пачку писем, возвращает число обработанных писем.
+        """
+        with transaction.atomic():
+            batch = list(
+                OutgoingEmail.objects.select_for_update(skip_locked=True)
+                .filter(status=PENDING, next_attempt_at__lte=timezone.now())
+                .order_by('next_attempt_at')[:batch_size]
+            )
+            if not batch:
+                return 0
+            errors = {}
+            try:
+                with get_connection() as connection:
+                    for email in batch:
+                        try:
+                            connection.send_messages([email.as_message()])
+                        except Exception as error:
+                            errors[email.pk] = error
+            except Exception as error:
+                errors.update(
+                    (email.pk, error) for email in batch
+                    if email.pk not in errors
+                )
+            now = timezone.now()
+            for email in batch:
+                if email.pk in errors:
+                    self.reschedule(
+                        email, errors[email.pk], now, max_attempts, backoff)
+                else:
+                    email.status = SENT
+                    email.sent_at = now
+            OutgoingEmail.objects.bulk_update(
+                batch,
+                ('status', 'sent_at', 'attempts',
+                 'next_attempt_at', 'last_error'),
+            )
+        self.stdout.write(
+            f'Отправлено писем: {len(batch) - len(errors)}, '
+            f'ошибок: {len(errors)}.'
+        )
+        return len(batch)
+
+    @staticmethod
+    def reschedule(email, error, now, max_attempts, backoff):
+        email.attempts += 1
+        email.last_error = repr(error)
+        if email.attempts >= max_attempts:
+            email.status = FAILED
+        else:
+            email.next_attempt_at = now + timedelta(
+                seconds=backoff * 2 ** (email.attempts - 1))
@@ -1,6 +1,8 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
-from django.db.models import UniqueConstraint
+from django.core.mail import EmailMessage
+from django.db import IntegrityError, models, transaction
+from django.db.models import Q, UniqueConstraint
+from django.utils import timezone
 
 from .validators import validate_username
 
@@ -14,6 +16,16 @@ LIST_OF_ROLES = [
     (USER, USER),
 ]
 
+PENDING = 'pending'
+SENT = 'sent'
+FAILED = 'failed'
+
+LIST_OF_EMAIL_STATUSES = [
+    (PENDING, PENDING),
+    (SENT, SENT),
+    (FAILED, FAILED),
+]
+
 
 class User(AbstractUser):
     """
@@ -92,3 +104,104 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.username
+
+
+class OutgoingEmailManager(models.Manager):
+
+    def enqueue(self, to_email, subject, body):
+        """
+        Ставит письмо в очередь на отправку. Если для адреса уже есть
+        неотправленное письмо, оно заменяется новым, поэтому повторные
+        регистрации не порождают лишних писем.
+        """
+        defaults = {
+            'subject': subject,
+            'body': body,
+            'attempts': 0,
+            'next_attempt_at': timezone.now(),
+            'last_error': '',
+        }
+        try:
+            with transaction.atomic():
+                email, _ = self.update_or_create(
+                    to_email=to_email, status=PENDING, defaults=defaults)
+        except IntegrityError:
+            email, _ = self.update_or_create(
+                to_email=to_email, status=PENDING, defaults=defaults)
+        return email
+
+
+class OutgoingEmail(models.Model):
+    """
+    Очередь исходящих писем. Письма добавляются при регистрации и
+    отправляются командой send_emails пачками через одно SMTP-соединение,
+    неудачные попытки повторяются с экспоненциальной задержкой.
+    """
+    to_email = models.EmailField(
+        max_length=200,
+        verbose_name='Получатель'
+    )
+    subject = models.CharField(
+        max_length=200,
+        verbose_name='Тема'
+    )
+    body = models.TextField(
+        verbose_name='Текст письма'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=LIST_OF_EMAIL_STATUSES,
+        default=PENDING,
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Число попыток'
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Следующая попытка'
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания'
+    )
+    sent_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='Дата отправки'
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка'
+    )
+
+    objects = OutgoingEmailManager()
+
+    class Meta:
+        ordering = ('next_attempt_at',)
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        constraints = [
+            UniqueConstraint(
+                fields=['to_email'],
+                condition=Q(status=PENDING),
+                name='unique_pending_email'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt_at'],
+                name='outgoing_email_queue_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.to_email}: {self.subject}'
+
+    def as_message(self):
+        return EmailMessage(
+            subject=self.subject,
+            body=self.body,
+            to=[self.to_email]
+        )
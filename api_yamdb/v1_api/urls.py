@@ -1,5 +1,7 @@
-from api.views import (APIGetToken, APISignup, CategoryViewSet, CommentViewSet,
-                       GenreViewSet, ReviewViewSet, TitleViewSet, UsersViewSet)
+from api.views import (APIGetToken, APISignup, CategoryViewSet,
+                       CommentExportView, CommentViewSet, GenreViewSet,
+                       ReviewExportView, ReviewImportView, ReviewViewSet,
+                       TitleViewSet, UsersViewSet)
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter, SimpleRouter
 
@@ -37,4 +39,16 @@ urlpatterns = [
     path('', include(v1_router_auth.urls)),
     path('', include(v1_router.urls)),
     path('auth/signup/', APISignup.as_view(), name='signup'),
+    path(
+        'export/reviews/',
+        ReviewExportView.as_view(),
+        name='export_reviews'),
+    path(
+        'export/comments/',
+        CommentExportView.as_view(),
+        name='export_comments'),
+    path(
+        'import/reviews/',
+        ReviewImportView.as_view(),
+        name='import_reviews'),
 ]
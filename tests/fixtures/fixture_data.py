@@ -0,0 +1,70 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestUser', email='testuser@yamdb.fake', password='1234567')
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestAdmin', email='testadmin@yamdb.fake',
+        password='1234567', role='admin')
+
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+@pytest.fixture
+def user_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def admin_client(admin):
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    return client
+
+
+@pytest.fixture
+def category():
+    from reviews.models import Category
+    return Category.objects.create(name='Фильмы', slug='movies')
+
+
+@pytest.fixture
+def genres():
+    from reviews.models import Genre
+    return [
+        Genre.objects.create(name='Драма', slug='drama'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+    ]
+
+
+@pytest.fixture
+def title(category, genres):
+    from reviews.models import Title
+    title = Title.objects.create(
+        name='Побег из Шоушенка', year=1994, category=category)
+    title.genre.set(genres)
+    return title
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budgets(settings):
+    settings.QUERY_BUDGET_STRICT = True
+
+
+@pytest.fixture(autouse=True)
+def reset_throttles():
+    from api.throttling import get_throttle_cache, reset_local_buckets
+    get_throttle_cache().clear()
+    reset_local_buckets()
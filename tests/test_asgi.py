@@ -0,0 +1,55 @@
+import asyncio
+import json
+
+import pytest
+
+from api_yamdb.asgi import application
+from reviews.models import Title
+
+
+async def call_application(scope, messages):
+    sent = []
+    messages = iter(messages)
+
+    async def receive():
+        return next(messages)
+
+    async def send(message):
+        sent.append(message)
+
+    await application(scope, receive, send)
+    return sent
+
+
+def run(scope, messages):
+    return asyncio.run(call_application(scope, messages))
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsgiApplication:
+
+    def test_lifespan(self):
+        sent = run({'type': 'lifespan'}, [
+            {'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'},
+        ])
+        assert [message['type'] for message in sent] == [
+            'lifespan.startup.complete', 'lifespan.shutdown.complete',
+        ], 'Проверьте, что ASGI-приложение поддерживает протокол lifespan'
+
+    def test_http_request(self):
+        Title.objects.create(name='Произведение', year=2000)
+        scope = {
+            'type': 'http', 'http_version': '1.1', 'method': 'GET',
+            'path': '/api/v1/titles/', 'root_path': '', 'query_string': b'',
+            'headers': [(b'host', b'testserver')],
+            'server': ('testserver', 80), 'client': ('127.0.0.1', 5000),
+        }
+        sent = run(scope, [
+            {'type': 'http.request', 'body': b'', 'more_body': False},
+        ])
+        assert sent[0]['type'] == 'http.response.start'
+        assert sent[0]['status'] == 200, (
+            'Проверьте, что ASGI-приложение обслуживает запросы к API'
+        )
+        body = b''.join(message.get('body', b'') for message in sent[1:])
+        assert json.loads(body)['results'][0]['name'] == 'Произведение'
@@ -0,0 +1,76 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.authentication import AUTH_USER_FIELDS, user_cache_key
+
+
+def user_queries(context):
+    return [
+        query for query in context.captured_queries
+        if 'FROM "users_user"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+
+    @pytest.fixture
+    def token_client(self, user):
+        client = APIClient()
+        token = RefreshToken.for_user(user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def test_user_loaded_once(self, token_client):
+        assert token_client.get('/api/v1/users/me/').status_code == 200
+        with CaptureQueriesContext(connection) as context:
+            response = token_client.get('/api/v1/users/')
+        assert response.status_code == 403
+        assert not user_queries(context), (
+            'Проверьте, что пользователь из токена берется из кэша'
+        )
+        response = token_client.get('/api/v1/users/me/')
+        assert response.json()['username'] == 'TestUser'
+        assert response.json()['email'] == 'testuser@yamdb.fake', (
+            'Проверьте, что поля профиля загружаются из базы'
+        )
+
+    def test_cached_fields(self, token_client, user):
+        token_client.get('/api/v1/users/me/')
+        cached = cache.get(user_cache_key(user.pk))
+        assert set(cached) == set(AUTH_USER_FIELDS), (
+            'Проверьте, что в кэш попадают только поля для проверки прав'
+        )
+        assert 'password' not in cached
+        assert 'confirmation_code' not in cached
+
+    def test_deactivation_invalidates_cache(self, token_client, user):
+        assert token_client.get('/api/v1/users/me/').status_code == 200
+        user.is_active = False
+        user.save()
+        assert token_client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что блокировка пользователя сбрасывает кэш'
+        )
+
+    def test_role_change_invalidates_cache(
+            self, token_client, admin_client, user):
+        assert token_client.get('/api/v1/users/').status_code == 403
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'})
+        assert response.status_code == 200
+        assert token_client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что смена роли сбрасывает кэш пользователя'
+        )
+
+    def test_me_patch_invalidates_cache(self, token_client):
+        token_client.patch('/api/v1/users/me/', data={'bio': 'Новая'})
+        response = token_client.get('/api/v1/users/me/')
+        assert response.json()['bio'] == 'Новая'
@@ -0,0 +1,42 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from reviews.models import Comment, Review, Title
+
+
+@pytest.mark.django_db
+class TestBenchmark:
+
+    def test_seed_and_bench(self, tmp_path):
+        call_command(
+            'seed_yamdb', '--users=5', '--titles=3', '--genres=2',
+            '--reviews-per-title=2', '--comments-per-review=1',
+        )
+        assert Title.objects.count() == 3
+        assert Review.objects.count() == 6
+        assert Comment.objects.count() == 6
+        call_command('rebuild_ratings', '--check')
+
+        baseline = tmp_path / 'baseline.json'
+        call_command(
+            'bench_api', 'titles-list', 'reviews-list', '--requests=3',
+            '--concurrency=1', '--warmup=0', f'--save={baseline}',
+        )
+        report = json.loads(baseline.read_text(encoding='utf-8'))
+        result = report['endpoints']['titles-list']
+        assert result['requests'] == 3 and result['errors'] == 0, (
+            'Проверьте, что бенчмарк выполняет запросы к API без ошибок'
+        )
+        assert result['queries_per_request'] > 0
+        assert report['meta']['dataset']['title'] == 3
+
+        report['endpoints']['titles-list']['queries_per_request'] = 1
+        baseline.write_text(json.dumps(report), encoding='utf-8')
+        with pytest.raises(CommandError):
+            call_command(
+                'bench_api', 'titles-list', '--requests=3',
+                '--concurrency=1', '--warmup=0', f'--compare={baseline}',
+            )
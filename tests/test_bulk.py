@@ -0,0 +1,112 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title
+
+
+def title_item(name, genre=('drama',), category='movies', **fields):
+    return {'name': name, 'year': 2000, 'genre': list(genre),
+            'category': category, **fields}
+
+
+@pytest.mark.django_db
+class TestBulkTitles:
+
+    def test_created_like_single(self, admin_client, category, genres):
+        single = admin_client.post(
+            '/api/v1/titles/', title_item('Один', ('drama', 'comedy')),
+            format='json').json()
+        response = admin_client.post(
+            '/api/v1/titles/', [title_item('Два', ('comedy', 'drama'))],
+            format='json')
+        assert response.status_code == 201
+        created = response.json()[0]
+        assert created['status'] == 201
+        single.pop('id')
+        created['data'].pop('id')
+        assert created['data'] == {**single, 'name': 'Два'}, (
+            'Проверьте, что пакетное создание возвращает то же '
+            'представление, что и создание одного произведения'
+        )
+        title = Title.objects.get(name='Два')
+        assert set(title.genre.values_list('slug', flat=True)) == {
+            'drama', 'comedy'}
+
+    def test_per_item_errors(self, admin_client, title):
+        response = admin_client.post('/api/v1/titles/', [
+            title_item('Новое'),
+            title_item('Чужое', genre=('horror',)),
+            title_item(title.name),
+            title_item('Новое'),
+            title_item('Будущее', year=3000),
+        ], format='json')
+        assert response.status_code == 207
+        results = response.json()
+        assert [result['status'] for result in results] == [
+            201, 400, 400, 400, 400]
+        assert results[1]['errors'] == {
+            'genre': ['Object with slug=horror does not exist.']}
+        assert results[2]['errors'] == results[3]['errors'] == {
+            'non_field_errors': ['Произведение уже в базе']}, (
+            'Проверьте проверку уникальности названия в базе и в пакете'
+        )
+        assert 'year' in results[4]['errors']
+        assert Title.objects.filter(name='Новое').count() == 1
+
+    def test_queries_do_not_grow(self, admin_client, category, genres):
+        def count(names):
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.post(
+                    '/api/v1/titles/', [title_item(name) for name in names],
+                    format='json')
+            assert response.status_code == 201
+            return len(context)
+        assert count(['a1', 'a2']) == count([f'b{i}' for i in range(30)]), (
+            'Проверьте, что число запросов не зависит от размера пакета'
+        )
+
+    def test_limits(self, admin_client, user_client, category, settings):
+        settings.BULK_MAX_ITEMS = 2
+        items = [title_item(name) for name in 'abc']
+        assert admin_client.post(
+            '/api/v1/titles/', items, format='json').status_code == 400
+        assert admin_client.post(
+            '/api/v1/titles/', [], format='json').status_code == 400
+        assert user_client.post(
+            '/api/v1/titles/', items[:1], format='json').status_code == 403
+
+
+@pytest.mark.django_db
+class TestReviewImport:
+
+    def test_import(self, admin_client, user_client, title, user, admin):
+        Review.objects.create(title=title, author=admin, text='Был', score=2)
+        assert user_client.post(
+            '/api/v1/import/reviews/', [], format='json').status_code == 403
+        response = admin_client.post('/api/v1/import/reviews/', [
+            {'title': title.id, 'author': user.username,
+             'text': 'Отлично', 'score': 10},
+            {'title': title.id, 'author': user.username,
+             'text': 'Повтор', 'score': 1},
+            {'title': title.id, 'author': admin.username,
+             'text': 'Снова', 'score': 1},
+            {'title': title.id + 1, 'author': 'nobody',
+             'text': 'Куда', 'score': 11},
+            {'title': title.id + 1, 'author': 'nobody',
+             'text': 'Куда', 'score': 5},
+        ], format='json')
+        assert response.status_code == 207
+        results = response.json()
+        assert [result['status'] for result in results] == [
+            201, 400, 400, 400, 400]
+        review = Review.objects.get(author=user)
+        assert results[0]['data']['id'] == review.id
+        assert results[0]['data']['title'] == title.name
+        assert 'score' in results[3]['errors']
+        assert set(results[4]['errors']) == {'title', 'author'}
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (12, 2), (
+            'Проверьте, что импорт отзывов обновляет рейтинг произведения'
+        )
+
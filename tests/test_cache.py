@@ -0,0 +1,49 @@
+import pytest
+from django.core.cache import cache
+
+from api.cache import get_stats
+from reviews.models import Genre
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+class TestCatalogCache:
+
+    def test_category_list_cached_and_invalidated(
+            self, client, admin_client, category):
+        first = client.get('/api/v1/categories/')
+        second = client.get('/api/v1/categories/')
+        assert first['X-Cache'] == 'MISS'
+        assert second['X-Cache'] == 'HIT', (
+            'Проверьте, что повторный запрос списка категорий берется из кэша'
+        )
+        assert first.json() == second.json()
+        assert get_stats('categories') == {'hits': 1, 'misses': 1}
+
+        response = admin_client.post(
+            '/api/v1/categories/', data={'name': 'Книги', 'slug': 'books'})
+        assert response.status_code == 201
+        third = client.get('/api/v1/categories/')
+        assert third['X-Cache'] == 'MISS', (
+            'Проверьте, что создание категории сбрасывает кэш'
+        )
+        assert third.json()['count'] == 2
+
+    def test_cache_key_depends_on_params(self, client, genres):
+        client.get('/api/v1/genres/')
+        response = client.get('/api/v1/genres/', {'search': 'Драма'})
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == 1
+
+    def test_model_change_invalidates(self, client, genres):
+        client.get('/api/v1/genres/')
+        Genre.objects.filter(slug='drama').get().delete()
+        response = client.get('/api/v1/genres/')
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == 1
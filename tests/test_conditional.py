@@ -0,0 +1,133 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Comment, Review, Title
+from reviews.signals import shift_comment_counts
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def test_title_detail_not_modified(self, client, title, user):
+        url = f'/api/v1/titles/{title.pk}/'
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.has_header('ETag')
+        assert response.has_header('Last-Modified')
+
+        cached = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert cached.status_code == 304, (
+            'Проверьте, что при совпадении ETag возвращается 304'
+        )
+        assert not cached.content
+
+        Review.objects.create(title=title, author=user, text='Ок', score=9)
+        changed = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert changed.status_code == 200, (
+            'Проверьте, что новый отзыв меняет ETag произведения'
+        )
+        assert changed.json()['rating'] == 9.0
+
+    def test_reviews_list_not_modified(self, client, title, user, admin):
+        review = Review.objects.create(
+            title=title, author=user, text='Ок', score=9)
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        etag = client.get(url)['ETag']
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        review.text = 'Изменено'
+        review.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        etag = response['ETag']
+
+        Review.objects.create(title=title, author=admin, text='Ещё', score=1)
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_reviews_list_changes_on_comments(self, client, title, user):
+        review = Review.objects.create(
+            title=title, author=user, text='Ок', score=9)
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        etag = client.get(url)['ETag']
+
+        comment = Comment.objects.create(
+            review=review, author=user, text='Согласен')
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что новый комментарий меняет ETag списка отзывов'
+        )
+        assert response.json()['results'][0]['comment_count'] == 1
+        etag = response['ETag']
+
+        comment.delete()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что удаление комментария меняет ETag списка отзывов'
+        )
+        assert response.json()['results'][0]['comment_count'] == 0
+
+    def test_bulk_comment_counts_change_etags(self, client, title, user):
+        review = Review.objects.create(
+            title=title, author=user, text='Ок', score=9)
+        urls = [
+            f'/api/v1/titles/{title.pk}/reviews/',
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/',
+        ]
+        etags = [client.get(url)['ETag'] for url in urls]
+        shift_comment_counts({review.pk: 1})
+        for url, etag in zip(urls, etags):
+            assert client.get(
+                url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+                'Проверьте, что импорт комментариев меняет ETag списков'
+            )
+
+    def test_etag_depends_on_query(self, client, title):
+        etag = client.get('/api/v1/titles/')['ETag']
+        response = client.get(
+            '/api/v1/titles/', {'page': 1}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+    def test_titles_list_changes_on_write(self, client, title):
+        etag = client.get('/api/v1/titles/')['ETag']
+        assert client.get(
+            '/api/v1/titles/', HTTP_IF_NONE_MATCH=etag).status_code == 304
+        title.delete()
+        assert client.get(
+            '/api/v1/titles/', HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            'Проверьте, что удаление произведения меняет ETag списка'
+        )
+
+    def test_titles_list_changes_on_rebuild(self, client, title, user):
+        Review.objects.create(title=title, author=user, text='Ок', score=8)
+        Title.objects.update(rating_sum=0)
+        etag = client.get('/api/v1/titles/')['ETag']
+        call_command('rebuild_ratings')
+        assert client.get(
+            '/api/v1/titles/', HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            'Проверьте, что пересчет рейтинга меняет ETag списка, хотя '
+            'поколение кэша не меняется'
+        )
+
+    def test_reviews_list_changes_on_rebuild(self, client, title, user):
+        Review.objects.create(title=title, author=user, text='Ок', score=8)
+        Review.objects.update(comment_count=3)
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        etag = client.get(url)['ETag']
+        call_command('rebuild_counters')
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что пересчет числа комментариев меняет ETag'
+        )
+        assert response.json()['results'][0]['comment_count'] == 0
+
+    def test_title_changes_on_category_rename(self, client, title):
+        url = f'/api/v1/titles/{title.pk}/'
+        etags = [client.get(url)['ETag'], client.get('/api/v1/titles/')['ETag']]
+        title.category.name = 'Кино'
+        title.category.save()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etags[0]).status_code == 200
+        assert client.get(
+            '/api/v1/titles/', HTTP_IF_NONE_MATCH=etags[1]
+        ).status_code == 200, (
+            'Проверьте, что изменение категории меняет ETag произведений'
+        )
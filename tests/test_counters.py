@@ -0,0 +1,71 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from reviews.models import Comment, Review, Title
+
+
+@pytest.mark.django_db
+class TestCounters:
+
+    def test_counters_follow_api(self, client, user_client, title, admin):
+        review = Review.objects.create(
+            title=title, author=admin, text='Отлично', score=10)
+        url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+        comment_id = user_client.post(url, {'text': 'Согласен'}).json()['id']
+        user_client.post(url, {'text': 'Еще раз'})
+        review_url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/'
+        assert client.get(review_url).json()['comment_count'] == 2, (
+            'Проверьте, что создание комментария увеличивает comment_count'
+        )
+        assert user_client.delete(f'{url}{comment_id}/').status_code == 204
+        assert client.get(review_url).json()['comment_count'] == 1, (
+            'Проверьте, что удаление комментария уменьшает comment_count'
+        )
+        titles = client.get('/api/v1/titles/').json()['results']
+        assert titles[0]['review_count'] == 1, (
+            'Проверьте, что список произведений выдает число отзывов'
+        )
+
+    def test_cascades(self, title, user, admin):
+        other = Title.objects.create(name='Сталкер', year=1979)
+        review = Review.objects.create(
+            title=title, author=admin, text='Отлично', score=10)
+        other_review = Review.objects.create(
+            title=other, author=admin, text='Сложно', score=8)
+        Review.objects.create(title=other, author=user, text='Да', score=6)
+        Comment.objects.create(review=review, author=user, text='Согласен')
+        Comment.objects.create(review=review, author=admin, text='Спасибо')
+
+        user.delete()
+        review.refresh_from_db()
+        other.refresh_from_db()
+        assert review.comment_count == 1, (
+            'Проверьте, что удаление пользователя уменьшает число '
+            'комментариев его комментариями'
+        )
+        assert other.rating_count == 1, (
+            'Проверьте, что удаление пользователя уменьшает число отзывов'
+        )
+
+        Comment.objects.create(
+            review=other_review, author=admin, text='Согласен')
+        other.delete()
+        title.delete()
+        assert not Review.objects.exists()
+        assert not Comment.objects.exists()
+
+    def test_rebuild_counters(self, title, user):
+        review = Review.objects.create(
+            title=title, author=user, text='Отлично', score=10)
+        Comment.objects.create(review=review, author=user, text='Согласен')
+        call_command('rebuild_counters', '--check')
+
+        Review.objects.filter(pk=review.pk).update(comment_count=5)
+        with pytest.raises(CommandError):
+            call_command('rebuild_counters', '--check')
+        call_command('rebuild_counters')
+        review.refresh_from_db()
+        assert review.comment_count == 1, (
+            'Проверьте, что rebuild_counters восстанавливает comment_count'
+        )
@@ -0,0 +1,88 @@
+import csv
+import datetime as dt
+import io
+import json
+
+import pytest
+from django.utils import timezone
+
+from reviews.models import Comment, Review, Title
+
+
+@pytest.fixture
+def exported(title, user, admin):
+    other = Title.objects.create(name='Сталкер', year=1979)
+    old = Review.objects.create(title=title, author=user, text='Старый', score=8)
+    Review.objects.filter(pk=old.pk).update(
+        pub_date=timezone.make_aware(dt.datetime(2019, 1, 1)))
+    new = Review.objects.create(title=title, author=admin, text='Новый', score=6)
+    Review.objects.create(title=other, author=user, text='Другой', score=3)
+    Comment.objects.create(review=old, author=admin, text='Комментарий')
+    return title, old, new
+
+
+def read(response):
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    def test_permissions(self, client, user_client, exported):
+        assert client.get('/api/v1/export/reviews/').status_code == 401
+        assert user_client.get('/api/v1/export/reviews/').status_code == 403
+
+    def test_reviews_ndjson(self, admin_client, exported):
+        title, old, new = exported
+        response = admin_client.get('/api/v1/export/reviews/')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        assert 'attachment' in response['Content-Disposition']
+        rows = [json.loads(line) for line in read(response).splitlines()]
+        assert len(rows) == 3
+        assert rows[0] == {
+            'id': old.id,
+            'title_id': title.id,
+            'author': 'TestUser',
+            'text': 'Старый',
+            'score': 8,
+            'pub_date': '2019-01-01T00:00:00Z',
+        }, 'Проверьте поля выгрузки отзывов и сортировку по pub_date'
+
+    def test_filters(self, admin_client, exported):
+        title, old, new = exported
+        response = admin_client.get(
+            '/api/v1/export/reviews/',
+            {'title': title.id, 'since': '2020-01-01'})
+        rows = [json.loads(line) for line in read(response).splitlines()]
+        assert [row['id'] for row in rows] == [new.id], (
+            'Проверьте фильтры title и since в выгрузке отзывов'
+        )
+        assert admin_client.get(
+            '/api/v1/export/reviews/', {'since': 'вчера'}
+        ).status_code == 400
+        assert admin_client.get(
+            '/api/v1/export/reviews/', {'title': 'x'}).status_code == 400
+
+    def test_comments_csv(self, admin_client, exported):
+        title, old, new = exported
+        response = admin_client.get(
+            '/api/v1/export/comments/', {'format': 'csv', 'title': title.id})
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/csv')
+        rows = list(csv.DictReader(io.StringIO(read(response))))
+        assert len(rows) == 1
+        assert rows[0]['review_id'] == str(old.id)
+        assert rows[0]['title_id'] == str(title.id)
+        assert rows[0]['author'] == 'TestAdmin'
+
+    def test_batches(self, admin_client, exported, monkeypatch):
+        from api.export import ExportView
+        monkeypatch.setattr(ExportView, 'chunk_size', 1)
+        response = admin_client.get(
+            '/api/v1/export/reviews/', HTTP_ACCEPT='text/csv')
+        chunks = list(response.streaming_content)
+        assert len(chunks) == 4, (
+            'Проверьте, что выгрузка отправляется пачками по chunk_size '
+            'строк после заголовка CSV'
+        )
@@ -0,0 +1,238 @@
+import datetime as dt
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import mixins
+from rest_framework.permissions import BasePermission
+
+from api.fast_serializers import FastReadMixin
+from api.views import ReviewViewSet
+from reviews.models import Comment, Review, Title
+
+
+class HideTestUserReviews(BasePermission):
+
+    def has_object_permission(self, request, view, obj):
+        return obj.author.username != 'TestUser'
+
+
+@pytest.fixture
+def dataset(title, user, admin, genres):
+    Title.objects.create(name='Без категории', year=2001)
+    other = Title.objects.create(
+        name='Сталкер', year=1979, description='Зона', category=None)
+    other.genre.set(genres[:1])
+    first = Review.objects.create(
+        title=title, author=user, text='Отлично', score=10)
+    Review.objects.create(title=title, author=admin, text='Хорошо', score=7)
+    Review.objects.create(title=other, author=user, text='Сложно', score=8)
+    Review.objects.filter(pk=first.pk).update(pub_date=timezone.make_aware(
+        dt.datetime(2020, 5, 17, 10, 30, 15, 123456)))
+    Comment.objects.create(review=first, author=admin, text='Согласен')
+    Comment.objects.create(review=first, author=user, text='Спасибо')
+    return title, first
+
+
+@pytest.mark.django_db
+class TestFastSerializers:
+
+    def get_both(self, client, url, monkeypatch):
+        fast = client.get(url)
+        with monkeypatch.context() as patch:
+            patch.setattr(
+                FastReadMixin, 'list', mixins.ListModelMixin.list)
+            patch.setattr(
+                FastReadMixin, 'retrieve', mixins.RetrieveModelMixin.retrieve)
+            slow = client.get(url)
+        assert fast.status_code == slow.status_code == 200
+        return fast.content, slow.content
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/titles/',
+        '/api/v1/titles/?cursor=',
+        '/api/v1/titles/?genre=drama',
+        '/api/v1/titles/?search=шоушенка',
+    ])
+    def test_titles_list(self, client, dataset, url, monkeypatch):
+        fast, slow = self.get_both(client, url, monkeypatch)
+        assert fast == slow, (
+            'Проверьте, что быстрый сериализатор произведений выдает тот же '
+            'ответ, что и TitleListSerializer'
+        )
+
+    def test_object_permission_gets_instance(self, client, dataset,
+                                             monkeypatch, settings):
+        title, first = dataset
+        # Связь автора загружается только ради проверки прав.
+        settings.QUERY_BUDGET_STRICT = False
+        monkeypatch.setattr(
+            ReviewViewSet, 'permission_classes', [HideTestUserReviews])
+        response = client.get(
+            f'/api/v1/titles/{title.id}/reviews/{first.id}/')
+        assert response.status_code == 401, (
+            'Проверьте, что права на уровне объекта проверяются на '
+            'экземпляре модели, а не на строке values()'
+        )
+        other = Review.objects.exclude(author=first.author).get()
+        assert client.get(
+            f'/api/v1/titles/{title.id}/reviews/{other.id}/'
+        ).status_code == 200
+
+    def test_title_detail(self, client, dataset, monkeypatch):
+        title, _ = dataset
+        fast, slow = self.get_both(
+            client, f'/api/v1/titles/{title.id}/', monkeypatch)
+        assert fast == slow
+
+    def test_reviews(self, client, dataset, monkeypatch):
+        title, review = dataset
+        for url in (
+            f'/api/v1/titles/{title.id}/reviews/',
+            f'/api/v1/titles/{title.id}/reviews/?cursor=',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/',
+        ):
+            fast, slow = self.get_both(client, url, monkeypatch)
+            assert fast == slow, (
+                'Проверьте, что быстрый сериализатор отзывов выдает тот же '
+                f'ответ, что и ReviewSerializer ({url})'
+            )
+
+    def test_comments(self, client, dataset, monkeypatch):
+        title, review = dataset
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        fast, slow = self.get_both(client, url, monkeypatch)
+        assert fast == slow
+        comment = review.comments.first()
+        fast, slow = self.get_both(
+            client, f'{url}{comment.id}/', monkeypatch)
+        assert fast == slow
+
+    def test_missing_object(self, client, title):
+        assert client.get('/api/v1/titles/0/').status_code == 404
+        assert client.get(
+            f'/api/v1/titles/{title.id}/reviews/abc/').status_code == 404
+
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+
+    def test_titles_fields(self, client, dataset):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/?fields=id,name,rating')
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert all(
+            list(item) == ['id', 'name', 'rating'] for item in results
+        ), 'Проверьте, что ?fields= ограничивает поля ответа'
+        sql = ' '.join(
+            query['sql'] for query in context.captured_queries).lower()
+        assert 'description' not in sql and 'genre' not in sql, (
+            'Проверьте, что невыбранные колонки и жанры не запрашиваются'
+        )
+
+    def test_title_detail_omit(self, client, dataset):
+        title, _ = dataset
+        full = client.get(f'/api/v1/titles/{title.id}/').json()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                f'/api/v1/titles/{title.id}/?omit=stats,description')
+        data = response.json()
+        del full['stats'], full['description']
+        assert data == full, 'Проверьте, что ?omit= убирает поля из ответа'
+        assert not any(
+            'titlestats' in query['sql'].lower()
+            for query in context.captured_queries
+        ), 'Проверьте, что без stats распределение оценок не выбирается'
+
+    def test_reviews_and_comments_with_fields(self, client, dataset):
+        title, review = dataset
+        url = f'/api/v1/titles/{title.id}/reviews/?cursor=&fields=text'
+        data = client.get(url).json()
+        assert data['results'] and all(
+            list(item) == ['text'] for item in data['results']
+        ), 'Проверьте, что курсорная пагинация работает с ?fields='
+        url = (
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+            '?omit=review,pub_date'
+        )
+        data = client.get(url).json()
+        assert [list(item) for item in data['results']] == [
+            ['id', 'author', 'text']] * 2
+
+    def test_unknown_field(self, client, dataset):
+        response = client.get('/api/v1/titles/?fields=id,secret')
+        assert response.status_code == 400, (
+            'Проверьте, что неизвестные поля в ?fields= дают ошибку 400'
+        )
+        assert 'fields' in response.json()
+
+
+@pytest.mark.django_db
+class TestExpandReviews:
+
+    def test_titles_list(self, client, dataset, django_user_model):
+        title, first = dataset
+        for number in range(3):
+            author = django_user_model.objects.create_user(
+                username=f'author{number}', email=f'a{number}@yamdb.fake')
+            Review.objects.create(
+                title=title, author=author, text=f'Отзыв {number}', score=5)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/?expand=reviews[:2]')
+        assert response.status_code == 200
+        results = {item['id']: item for item in response.json()['results']}
+        expected = list(Review.objects.filter(title=title).order_by(
+            '-pub_date', 'id').values_list('id', flat=True)[:2])
+        assert [
+            review['id'] for review in results[title.id]['reviews']
+        ] == expected, (
+            'Проверьте, что встраиваются последние N отзывов произведения'
+        )
+        assert len(context.captured_queries) == 5, (
+            'Проверьте, что отзывы всех произведений страницы выбираются '
+            'фиксированным числом запросов'
+        )
+        assert all(len(item['reviews']) <= 2 for item in results.values())
+
+    def test_title_detail(self, client, dataset):
+        title, first = dataset
+        data = client.get(f'/api/v1/titles/{title.id}/?expand=reviews').json()
+        reviews = {review['id']: review for review in data['reviews']}
+        assert reviews[first.id]['comment_count'] == 2, (
+            'Проверьте, что у встроенных отзывов есть число комментариев'
+        )
+        assert reviews[first.id]['author'] == first.author.username
+        assert 'reviews' not in client.get(
+            f'/api/v1/titles/{title.id}/').json()
+
+    def test_etag_follows_embedded_reviews(self, client, dataset, user):
+        title, first = dataset
+        urls = [
+            f'/api/v1/titles/{title.id}/?expand=reviews',
+            '/api/v1/titles/?expand=reviews',
+        ]
+        etags = [client.get(url)['ETag'] for url in urls]
+        comment = Comment.objects.create(
+            review=first, author=user, text='Еще один')
+        for number, url in enumerate(urls):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[number])
+            assert response.status_code == 200, (
+                'Проверьте, что новый комментарий меняет ETag произведений '
+                'со встроенными отзывами'
+            )
+            etags[number] = response['ETag']
+        comment.delete()
+        for url, etag in zip(urls, etags):
+            assert client.get(
+                url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+                'Проверьте, что удаление комментария меняет ETag '
+                'произведений со встроенными отзывами'
+            )
+
+    @pytest.mark.parametrize(
+        'expand', ['comments', 'reviews[:0]', 'reviews[:99]'])
+    def test_invalid_expand(self, client, dataset, expand):
+        response = client.get(f'/api/v1/titles/?expand={expand}')
+        assert response.status_code == 400
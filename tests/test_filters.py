@@ -0,0 +1,43 @@
+import pytest
+
+from reviews.models import Title
+
+
+@pytest.mark.django_db
+class TestTitleFilters:
+
+    @pytest.fixture
+    def titles(self, category, genres):
+        drama, comedy = genres
+        first = Title.objects.create(
+            name='Брат', year=1997, category=category)
+        first.genre.set([drama])
+        second = Title.objects.create(
+            name='Бриллиантовая рука', year=1968, category=category)
+        second.genre.set([comedy])
+        return first, second
+
+    def names(self, response):
+        assert response.status_code == 200
+        return [item['name'] for item in response.json()['results']]
+
+    def test_filters(self, client, titles):
+        assert self.names(client.get(
+            '/api/v1/titles/', {'genre': 'comedy'})) == ['Бриллиантовая рука']
+        assert self.names(client.get(
+            '/api/v1/titles/', {'name': 'Брат'})) == ['Брат']
+        assert self.names(client.get(
+            '/api/v1/titles/', {'category': 'movies', 'year': 1997})
+        ) == ['Брат']
+        assert self.names(client.get(
+            '/api/v1/titles/', {'genre': 'unknown'})) == []
+
+    def test_filtered_list_query_count(
+            self, client, titles, django_assert_num_queries):
+        params = {'genre': 'drama', 'category': 'movies', 'name': 'Бр'}
+        with django_assert_num_queries(4):
+            response = client.get('/api/v1/titles/', params)
+        assert self.names(response) == ['Брат'], (
+            'Проверьте, что фильтрация произведений не строит списки '
+            'значений запросами к базе'
+        )
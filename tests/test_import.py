@@ -0,0 +1,80 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Comment, Review, Title
+
+
+@pytest.mark.django_db
+class TestImportYamdb:
+
+    def test_import_csv_and_ndjson(self, tmp_path, user, category, genres):
+        titles = tmp_path / 'titles.csv'
+        titles.write_text(
+            'id,name,year,category,genre\n'
+            '10,Брат,1997,movies,drama\n'
+            '11,Брат 2,2000,movies,"drama,comedy"\n',
+            encoding='utf-8',
+        )
+        reviews = tmp_path / 'reviews.ndjson'
+        reviews.write_text('\n'.join(json.dumps(record) for record in [
+            {'id': 5, 'title': 10, 'author': 'TestUser', 'text': 'Да',
+             'score': 9, 'pub_date': '2020-01-01T00:00:00Z'},
+            {'id': 6, 'title': 11, 'author': 'TestUser', 'text': 'Нет',
+             'score': 4},
+        ]), encoding='utf-8')
+        comments = tmp_path / 'comments.json'
+        comments.write_text(json.dumps([
+            {'review': 5, 'author': 'TestUser', 'text': 'Согласен'},
+        ]), encoding='utf-8')
+
+        call_command('import_yamdb', 'titles', str(titles), '--batch-size=1')
+        call_command('import_yamdb', 'reviews', str(reviews))
+        call_command('import_yamdb', 'comments', str(comments), '--chunked')
+
+        title = Title.objects.get(pk=11)
+        assert set(title.genre.values_list('slug', flat=True)) == {
+            'drama', 'comedy'}, 'Проверьте импорт связей произведений с жанрами'
+        assert Title.objects.get(pk=10).rating == 9.0, (
+            'Проверьте, что импорт отзывов обновляет рейтинг произведений'
+        )
+        assert Review.objects.get(pk=5).pub_date.year == 2020, (
+            'Проверьте, что импорт сохраняет дату публикации из файла'
+        )
+        assert Comment.objects.get().author == user
+        assert Review.objects.get(pk=5).comment_count == 1, (
+            'Проверьте, что импорт комментариев обновляет их число у отзывов'
+        )
+        call_command('rebuild_ratings', '--check')
+        call_command('rebuild_counters', '--check')
+
+    def test_fixture_parents_flushed_first(self, tmp_path):
+        users = [
+            {'model': 'users.user', 'pk': pk,
+             'fields': {'username': f'user{pk}', 'email': f'{pk}@yamdb.fake'}}
+            for pk in (100, 101, 102)
+        ]
+        fixture = tmp_path / 'fixture.json'
+        fixture.write_text(json.dumps(users + [
+            {'model': 'reviews.category', 'pk': 1,
+             'fields': {'name': 'Фильмы', 'slug': 'movies'}},
+            {'model': 'reviews.title', 'pk': 20,
+             'fields': {'name': 'Брат', 'year': 1997,
+                        'category': 'movies'}},
+            {'model': 'reviews.review', 'pk': 30,
+             'fields': {'title': 20, 'author': 'user100', 'text': 'Да',
+                        'score': 9}},
+            {'model': 'reviews.review', 'pk': 31,
+             'fields': {'title': 20, 'author': 'user102', 'text': 'Нет',
+                        'score': 5}},
+        ]), encoding='utf-8')
+
+        call_command(
+            'import_yamdb', 'fixture', str(fixture), '--batch-size=2')
+
+        assert Review.objects.get(pk=31).author.username == 'user102', (
+            'Проверьте, что перед пачкой отзывов записываются неполные '
+            'пачки пользователей и произведений'
+        )
+        assert Title.objects.get(pk=20).rating == 7.0
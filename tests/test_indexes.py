@@ -0,0 +1,29 @@
+import pytest
+from django.core.management import call_command
+
+from api.query_plans import HOT_QUERIES, plan_problems
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db
+class TestQueryPlans:
+
+    @pytest.mark.parametrize('name', HOT_QUERIES)
+    def test_hot_query_uses_index(self, name):
+        queryset = HOT_QUERIES[name]()
+        assert plan_problems(queryset) == [], (
+            f'Проверьте индексы для запроса {name}: EXPLAIN показывает '
+            'полное чтение таблицы или сортировку всей выборки'
+        )
+
+    def test_detects_full_scan(self):
+        assert plan_problems(Review.objects.filter(text='Отлично')), (
+            'Проверьте, что plan_problems находит полное чтение таблицы'
+        )
+        assert plan_problems(
+            Title.objects.filter(year=2000).order_by('description')[:10]
+        ), 'Проверьте, что plan_problems находит сортировку всей выборки'
+
+    def test_command(self, capsys):
+        call_command('audit_indexes', '--plans')
+        assert 'Индексы в порядке' in capsys.readouterr().out
@@ -0,0 +1,35 @@
+from unittest import mock
+
+import pytest
+
+from api.middleware import QueryBudgetExceeded, logger
+
+
+@pytest.mark.django_db
+class TestQueryInstrumentation:
+
+    def test_debug_headers(self, client, title, settings):
+        settings.DEBUG = True
+        response = client.get('/api/v1/titles/')
+        assert response['X-DB-Queries'] == '4', (
+            'Проверьте, что в режиме DEBUG в ответ добавляется число запросов'
+        )
+        assert float(response['X-DB-Time-Ms']) >= 0
+        assert float(response['X-Total-Time-Ms']) >= 0
+
+    def test_no_headers_without_debug(self, client, title):
+        response = client.get('/api/v1/titles/')
+        assert not response.has_header('X-DB-Queries')
+
+    def test_budget_exceeded(self, client, title, settings):
+        settings.QUERY_BUDGETS = {'TitleViewSet.list': 1}
+        with pytest.raises(QueryBudgetExceeded):
+            client.get('/api/v1/titles/')
+
+    def test_budget_warning(self, client, title, settings):
+        settings.QUERY_BUDGETS = {'TitleViewSet.list': 1}
+        settings.QUERY_BUDGET_STRICT = False
+        with mock.patch.object(logger, 'warning') as warning:
+            response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert warning.call_args[1]['extra']['metrics']['queries'] == 4
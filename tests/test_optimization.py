@@ -0,0 +1,78 @@
+import pytest
+
+from reviews.models import Comment, Review, Title
+
+
+@pytest.fixture
+def authors(django_user_model):
+    return [
+        django_user_model.objects.create_user(
+            username=f'author{number}', email=f'author{number}@yamdb.fake')
+        for number in range(12)
+    ]
+
+
+@pytest.fixture
+def reviews(title, authors):
+    return [
+        Review.objects.create(
+            title=title, author=author, text='Отзыв', score=number % 10 + 1)
+        for number, author in enumerate(authors)
+    ]
+
+
+@pytest.mark.django_db
+class TestQueryOptimization:
+
+    @pytest.mark.parametrize('page_size', [1, 12])
+    def test_reviews_list(self, client, reviews, page_size,
+                          django_assert_num_queries):
+        title = reviews[0].title_id
+        with django_assert_num_queries(3):
+            response = client.get(
+                f'/api/v1/titles/{title}/reviews/?limit={page_size}')
+        assert len(response.data['results']) == page_size
+        assert response.data['results'][0]['author'].startswith('author'), (
+            'Проверьте, что автор отзыва выводится по username'
+        )
+
+    @pytest.mark.parametrize('count', [1, 10])
+    def test_comments_list(self, client, reviews, authors, count,
+                           django_assert_num_queries):
+        review = reviews[0]
+        Comment.objects.bulk_create(
+            Comment(review=review, author=author, text='Комментарий')
+            for author in authors[:count]
+        )
+        with django_assert_num_queries(3):
+            response = client.get(
+                f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+                'comments/')
+        assert len(response.data['results']) == count
+        assert response.data['results'][0]['review'] == 'Отзыв'
+
+    @pytest.mark.parametrize('count', [1, 12])
+    def test_titles_list(self, client, category, genres, count,
+                         django_assert_num_queries):
+        for number in range(count):
+            Title.objects.create(
+                name=f'Произведение {number}', year=2000, category=category
+            ).genre.set(genres)
+        with django_assert_num_queries(4):
+            response = client.get('/api/v1/titles/')
+        result = response.data['results'][0]
+        assert result['category'] == {'name': 'Фильмы', 'slug': 'movies'}
+        assert len(result['genre']) == 2
+
+    def test_review_update_is_not_restricted(self, user_client, user,
+                                             title):
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5)
+        response = user_client.patch(
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/',
+            data={'score': 9})
+        assert response.status_code == 200
+        title.refresh_from_db()
+        assert title.rating == 9, (
+            'Проверьте, что изменение отзыва по-прежнему обновляет рейтинг'
+        )
@@ -0,0 +1,64 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from users.models import FAILED, PENDING, SENT, OutgoingEmail
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+
+    def test_signup_enqueues_email(self, client):
+        data = {'username': 'newuser', 'email': 'newuser@yamdb.fake'}
+        response = client.post('/api/v1/auth/signup/', data=data)
+        assert response.status_code == 200
+        assert not mail.outbox, (
+            'Проверьте, что письмо не отправляется во время запроса'
+        )
+        OutgoingEmail.objects.enqueue(
+            'newuser@yamdb.fake', 'Тема', 'Повторный код')
+        assert OutgoingEmail.objects.filter(
+            to_email='newuser@yamdb.fake', status=PENDING).count() == 1, (
+            'Проверьте, что повторная регистрация не дублирует письмо'
+        )
+
+        call_command('send_emails')
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ['newuser@yamdb.fake']
+        assert OutgoingEmail.objects.get().status == SENT
+
+    def test_batch_uses_one_connection(self):
+        for number in range(3):
+            OutgoingEmail.objects.enqueue(
+                f'user{number}@yamdb.fake', 'Тема', 'Текст')
+        with mock.patch(
+            'users.management.commands.send_emails.get_connection',
+            wraps=mail.get_connection,
+        ) as get_connection:
+            call_command('send_emails', '--batch-size', '10')
+        assert get_connection.call_count == 1
+        assert len(mail.outbox) == 3
+
+    def test_failed_email_is_retried_with_backoff(self):
+        email = OutgoingEmail.objects.enqueue(
+            'broken@yamdb.fake', 'Тема', 'Текст')
+        with mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages',
+            side_effect=OSError('SMTP недоступен'),
+        ):
+            call_command('send_emails', '--max-attempts', '2')
+            email.refresh_from_db()
+            assert email.status == PENDING
+            assert email.attempts == 1
+            assert email.next_attempt_at > timezone.now()
+
+            OutgoingEmail.objects.update(
+                next_attempt_at=timezone.now() - timedelta(seconds=1))
+            call_command('send_emails', '--max-attempts', '2')
+        email.refresh_from_db()
+        assert email.status == FAILED
+        assert not mail.outbox
@@ -0,0 +1,93 @@
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from api.counting import EstimatedCountPaginator, estimated_count
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def test_titles_page_number_still_works(self, client, title):
+        response = client.get('/api/v1/titles/?page=1')
+        assert response.status_code == 200
+        assert response.json()['count'] == 1, (
+            'Проверьте, что постраничная пагинация произведений сохранилась'
+        )
+
+    def test_titles_cursor(self, client, category):
+        for number in range(15):
+            Title.objects.create(
+                name=f'Произведение {number}', year=2000, category=category)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/?cursor=')
+        data = response.json()
+        assert response.status_code == 200
+        assert 'count' not in data
+        assert not any(
+            'COUNT(' in query['sql'].upper() for query in context.captured_queries
+        ), 'Проверьте, что курсорная пагинация не выполняет COUNT(*)'
+        ids = [item['id'] for item in data['results']]
+        assert ids == sorted(ids, reverse=True)
+
+        second = client.get(data['next']).json()
+        second_ids = [item['id'] for item in second['results']]
+        assert len(ids) + len(second_ids) == 15
+        assert not set(ids) & set(second_ids)
+
+    def test_reviews_cursor_and_offset(self, client, title, django_user_model):
+        for number in range(12):
+            author = django_user_model.objects.create_user(
+                username=f'author{number}', email=f'a{number}@yamdb.fake')
+            Review.objects.create(
+                title=title, author=author, text='Текст', score=5)
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        offset_data = client.get(url, {'limit': 5, 'offset': 10}).json()
+        assert offset_data['count'] == 12
+        assert len(offset_data['results']) == 2
+
+        cursor_data = client.get(url, {'cursor': ''}).json()
+        assert 'count' not in cursor_data
+        assert len(cursor_data['results']) == 10
+        assert cursor_data['next']
+
+
+@pytest.mark.django_db
+class TestEstimatedCount:
+
+    def test_large_table_count_is_cached(self, client, category, settings):
+        settings.ESTIMATED_COUNT_THRESHOLD = 3
+        for number in range(3):
+            Title.objects.create(
+                name=f'Произведение {number}', year=2000, category=category)
+        assert client.get('/api/v1/titles/').json()['count'] == 3
+        Title.objects.create(name='Новое', year=2001, category=category)
+        assert client.get('/api/v1/titles/?page=1').json()['count'] == 3, (
+            'Проверьте, что для большой таблицы число строк берется из кэша'
+        )
+        assert client.get('/api/v1/titles/?year=2001').json()['count'] == 1, (
+            'Проверьте, что отфильтрованная выборка считается точно'
+        )
+
+    def test_small_table_counted_exactly(self, category, settings):
+        settings.ESTIMATED_COUNT_THRESHOLD = 10
+        for number in range(2):
+            Title.objects.create(
+                name=f'Произведение {number}', year=2000, category=category)
+            assert estimated_count(Title.objects.all()) == number + 1, (
+                'Проверьте, что маленькие таблицы считаются точно'
+            )
+
+    def test_admin_changelist(self, django_user_model, title):
+        admin = django_user_model.objects.create_superuser(
+            username='root', email='root@yamdb.fake', password='1234567')
+        client = Client()
+        client.force_login(admin)
+        response = client.get('/admin/reviews/title/')
+        assert response.status_code == 200
+        assert isinstance(
+            response.context['cl'].paginator, EstimatedCountPaginator
+        ), 'Проверьте, что админка использует EstimatedCountPaginator'
+        assert response.context['cl'].result_count == 1
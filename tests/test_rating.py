@@ -0,0 +1,147 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title, TitleStats
+from reviews.signals import shift_title_ratings
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def test_rating_follows_reviews(self, title, user, admin):
+        review = Review.objects.create(
+            title=title, author=user, text='Отлично', score=10)
+        Review.objects.create(
+            title=title, author=admin, text='Неплохо', score=5)
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (15, 2), (
+            'Проверьте, что создание отзыва обновляет рейтинг произведения'
+        )
+        assert title.rating == 7.5
+
+        review = Review.objects.get(pk=review.pk)
+        review.score = 7
+        review.save()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (12, 2), (
+            'Проверьте, что изменение оценки обновляет рейтинг произведения'
+        )
+
+        user.delete()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (5, 1), (
+            'Проверьте, что удаление отзыва обновляет рейтинг произведения'
+        )
+
+    def test_title_without_reviews(self, client, title):
+        response = client.get(f'/api/v1/titles/{title.pk}/')
+        assert response.status_code == 200
+        assert response.json()['rating'] is None
+
+    def test_rating_in_response(self, client, title, user):
+        Review.objects.create(title=title, author=user, text='Ок', score=8)
+        response = client.get('/api/v1/titles/')
+        assert response.json()['results'][0]['rating'] == 8.0
+
+    def test_rebuild_ratings(self, title, user):
+        Review.objects.create(title=title, author=user, text='Ок', score=8)
+        Title.objects.update(rating_sum=0, rating_count=0)
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check')
+        call_command('rebuild_ratings')
+        call_command('rebuild_ratings', '--check')
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (8, 1)
+
+    def test_rebuild_stats(self, title, user, admin):
+        Review.objects.create(title=title, author=user, text='Ок', score=8)
+        Review.objects.create(title=title, author=admin, text='Ок', score=3)
+        TitleStats.objects.all().delete()
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check')
+        call_command('rebuild_ratings')
+        assert title.stats.histogram == {
+            score: int(score in (3, 8)) for score in TitleStats.SCORES}
+        TitleStats.objects.update(score_8=5)
+        call_command('rebuild_ratings')
+        call_command('rebuild_ratings', '--check')
+        title.stats.refresh_from_db()
+        assert title.stats.score_8 == 1
+
+
+def histogram(**counts):
+    return {str(score): counts.get(f's{score}', 0) for score in range(1, 11)}
+
+
+@pytest.mark.django_db
+class TestTitleStats:
+
+    def test_histogram_follows_reviews(self, client, title, user, admin):
+        url = f'/api/v1/titles/{title.pk}/stats/'
+        assert client.get(url).json() == {
+            'count': 0, 'sum': 0, 'histogram': histogram()}
+        review = Review.objects.create(
+            title=title, author=user, text='Отлично', score=10)
+        Review.objects.create(title=title, author=admin, text='Ок', score=5)
+        assert client.get(url).json() == {
+            'count': 2, 'sum': 15, 'histogram': histogram(s5=1, s10=1)}
+
+        review = Review.objects.get(pk=review.pk)
+        review.score = 5
+        review.save()
+        assert client.get(url).json()['histogram'] == histogram(s5=2), (
+            'Проверьте, что изменение оценки переносит отзыв в '
+            'распределении оценок'
+        )
+        admin.delete()
+        assert client.get(url).json() == {
+            'count': 1, 'sum': 5, 'histogram': histogram(s5=1)}
+
+    def test_stats_in_detail(self, client, title, user):
+        Review.objects.create(title=title, author=user, text='Ок', score=7)
+        response = client.get(f'/api/v1/titles/{title.pk}/')
+        assert response.json()['stats'] == {
+            'count': 1, 'sum': 7, 'histogram': histogram(s7=1)}
+        assert 'stats' not in client.get(
+            '/api/v1/titles/').json()['results'][0]
+
+    def test_missing_title(self, client, title):
+        assert client.get('/api/v1/titles/0/stats/').status_code == 404
+        assert client.get('/api/v1/titles/x/stats/').status_code == 404
+
+    def test_bulk_import(self, admin_client, title, user, admin):
+        Review.objects.create(title=title, author=admin, text='Ок', score=2)
+        admin_client.post('/api/v1/import/reviews/', [
+            {'title': title.pk, 'author': user.username,
+             'text': 'Ок', 'score': 9},
+        ], format='json')
+        assert title.stats.histogram == {
+            score: int(score in (2, 9)) for score in TitleStats.SCORES}, (
+            'Проверьте, что пакетный импорт отзывов обновляет распределение '
+            'оценок'
+        )
+
+    def test_shift_groups_titles(self, title, user):
+        titles = [title] + [
+            Title.objects.create(name=f'Фильм {number}', year=2000)
+            for number in range(2)
+        ]
+        for item in titles:
+            Review.objects.create(title=item, author=user, text='Ок', score=4)
+        with CaptureQueriesContext(connection) as context:
+            shift_title_ratings({(item.pk, 7): 1 for item in titles})
+        updates = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('UPDATE')
+        ]
+        assert len(updates) == 2, (
+            'Проверьте, что произведения с одинаковым изменением рейтинга '
+            'обновляются одним запросом'
+        )
+        for item in titles:
+            item.refresh_from_db()
+            assert (item.rating_sum, item.rating_count) == (11, 2)
+            assert item.stats.histogram[7] == 1
@@ -0,0 +1,97 @@
+import datetime as dt
+import decimal
+import io
+import uuid
+from collections import OrderedDict
+
+import pytest
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api import parsers, renderers
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+
+PAYLOAD = OrderedDict([
+    ('count', 2),
+    ('aware', timezone.make_aware(dt.datetime(2021, 3, 4, 5, 6, 7, 891011))),
+    ('naive', dt.datetime(2021, 3, 4, 5, 6, 7)),
+    ('date', dt.date(2021, 3, 4)),
+    ('time', dt.time(5, 6, 7, 8)),
+    ('delta', dt.timedelta(hours=1, microseconds=5)),
+    ('decimal', decimal.Decimal('7.50')),
+    ('uuid', uuid.UUID('12345678-1234-5678-1234-567812345678')),
+    ('lazy', gettext_lazy('Произведение')),
+    ('separators', 'строка\u2028с\u2029разделителями'),
+    ('numbers', [1, 2.5, 7 / 3, 0.0001, -0.0, None, True]),
+    ('keys', {1: 'один', 'два': 2}),
+    ('results', [OrderedDict([('name', 'Брат'), ('genre', ())])]),
+])
+
+
+class TestFastJSONRenderer:
+
+    @pytest.mark.parametrize('media_type', [
+        None, 'application/json', 'application/json; indent=4'])
+    def test_same_output(self, media_type):
+        context = {}
+        assert FastJSONRenderer().render(
+            PAYLOAD, media_type, context
+        ) == JSONRenderer().render(PAYLOAD, media_type, context), (
+            'Проверьте, что FastJSONRenderer выдает тот же JSON, что и '
+            'JSONRenderer'
+        )
+
+    @pytest.mark.parametrize('data', [
+        {'big': 2 ** 70},
+        {'floats': [1e-7, 5e-5, 1e16, 1.5e300]},
+    ])
+    def test_fallback(self, data):
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(renderers, 'orjson', None)
+        assert FastJSONRenderer().render(
+            PAYLOAD) == JSONRenderer().render(PAYLOAD)
+
+    def test_none(self):
+        assert FastJSONRenderer().render(None) == b''
+
+
+class TestFastJSONParser:
+
+    def parse(self, parser, body, encoding='utf-8'):
+        return parser.parse(
+            io.BytesIO(body), parser_context={'encoding': encoding})
+
+    @pytest.mark.parametrize('body', [
+        '{"name": "Брат", "year": 1997, "genre": ["drama"], "x": null}',
+        '[1e400, 0.1, -5]',
+        '"\\ud800"',
+    ])
+    def test_same_result(self, body):
+        body = body.encode()
+        assert self.parse(FastJSONParser(), body) == self.parse(
+            JSONParser(), body)
+
+    @pytest.mark.parametrize('body', [b'{"a": NaN}', b'{"a": 1', b'\xff'])
+    def test_errors(self, body):
+        with pytest.raises(ParseError) as fast_error:
+            self.parse(FastJSONParser(), body)
+        with pytest.raises(ParseError) as error:
+            self.parse(JSONParser(), body)
+        assert str(fast_error.value) == str(error.value), (
+            'Проверьте, что текст ошибки разбора совпадает со стандартным'
+        )
+
+    def test_other_encoding(self):
+        body = '{"name": "Брат"}'.encode('utf-16')
+        assert self.parse(FastJSONParser(), body, 'utf-16') == {
+            'name': 'Брат'}
+
+    def test_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(parsers, 'orjson', None)
+        assert self.parse(FastJSONParser(), b'{"a": 1}') == {'a': 1}
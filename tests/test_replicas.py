@@ -0,0 +1,152 @@
+import shutil
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.cache import get_cache
+from api.replicas import ReplicaRouter
+from reviews.models import Category, Review, Title
+
+ALIASES = ('test_replica_1', 'test_replica_2')
+
+
+def add_database(alias, path):
+    connections.databases[alias] = dict(
+        connections.databases['default'], NAME=str(path), TEST={})
+
+
+def remove_database(alias):
+    connections[alias].close()
+    if hasattr(connections._connections, alias):
+        delattr(connections._connections, alias)
+    del connections.databases[alias]
+
+
+@pytest.fixture(scope='session')
+def replica_template(tmp_path_factory, django_db_setup, django_db_blocker):
+    """
+    Пустая база со схемой, из которой копируются реплики для тестов.
+    """
+    path = tmp_path_factory.mktemp('replicas') / 'template.sqlite3'
+    add_database('replica_template', path)
+    try:
+        with django_db_blocker.unblock():
+            call_command(
+                'migrate', database='replica_template', verbosity=0)
+    finally:
+        remove_database('replica_template')
+    return path
+
+
+@pytest.fixture
+def replicas(replica_template, tmp_path, settings):
+    for alias in ALIASES:
+        path = tmp_path / f'{alias}.sqlite3'
+        shutil.copy(replica_template, path)
+        add_database(alias, path)
+    settings.DATABASE_REPLICAS = list(ALIASES)
+    get_cache().clear()
+    yield ALIASES
+    for alias in ALIASES:
+        remove_database(alias)
+
+
+def jwt_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    return client
+
+
+@pytest.mark.django_db
+class TestReplicaRouting:
+
+    def test_reads_balanced_across_replicas(self, client, replicas):
+        for alias in replicas:
+            Title.objects.using(alias).create(name=alias, year=2000)
+        get_cache().clear()
+        names = [
+            client.get('/api/v1/titles/').json()['results'][0]['name']
+            for _ in range(4)
+        ]
+        assert sorted(names) == sorted(replicas * 2), (
+            'Проверьте, что безопасные запросы читают с реплик по очереди'
+        )
+        assert not Title.objects.exists()
+
+    def test_read_after_write(self, title, user, replicas, settings):
+        for alias in replicas:
+            user.save(using=alias)
+        user_client = jwt_client(user)
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        response = user_client.post(url, {'text': 'Ок', 'score': 7})
+        assert response.status_code == 201, (
+            'Проверьте, что запись идет в основную базу'
+        )
+        assert Review.objects.filter(title=title).count() == 1
+        assert user_client.get(url).json()['count'] == 1, (
+            'Проверьте, что после записи пользователь читает с основной базы'
+        )
+        assert APIClient().get(url).status_code == 404, (
+            'Проверьте, что остальные пользователи читают с реплик'
+        )
+
+        get_cache().clear()
+        assert user_client.get(url).status_code == 404, (
+            'Проверьте, что по истечении READ_AFTER_WRITE_SECONDS '
+            'пользователь снова читает с реплик'
+        )
+
+    def test_router_outside_requests(self, settings):
+        settings.DATABASE_REPLICAS = list(ALIASES)
+        router = ReplicaRouter()
+        assert router.db_for_read(Title) == 'default'
+        assert router.db_for_write(Title) == 'default'
+        assert router.allow_migrate(ALIASES[0], 'reviews') is False
+        assert router.allow_migrate('default', 'reviews') is None
+
+    def test_lagging_replica_after_bump(self, client, replicas):
+        Category.objects.create(name='Новая', slug='new')
+        assert client.get('/api/v1/categories/')['X-Cache'] == 'MISS'
+        for alias in replicas:
+            Category.objects.using(alias).create(name='Новая', slug='new')
+        response = client.get('/api/v1/categories/')
+        assert response.json()['count'] == 1, (
+            'Проверьте, что данные отстающей реплики не кэшируются под '
+            'новым поколением'
+        )
+
+    def test_title_etag_from_replica(self, client, replicas):
+        Title.objects.create(name='Новое', year=2000)
+        response = client.get('/api/v1/titles/')
+        assert response.json()['count'] == 0, (
+            'Проверьте, что список произведений читается с реплики и '
+            'после записи другими пользователями'
+        )
+        etag = response['ETag']
+        assert client.get(
+            '/api/v1/titles/', HTTP_IF_NONE_MATCH=etag).status_code == 304
+        title = Title.objects.get()
+        for alias in replicas:
+            title.save(using=alias)
+        response = client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что ETag строится по данным той же реплики, что и '
+            'ответ'
+        )
+        assert response.json()['count'] == 1
+
+    def test_role_change_with_lagging_replica(self, admin, replicas):
+        for alias in replicas:
+            admin.save(using=alias)
+        admin_client = jwt_client(admin)
+        assert admin_client.get('/api/v1/users/').status_code == 200
+        admin.role = 'user'
+        admin.save()
+        assert admin_client.get('/api/v1/users/').status_code == 403, (
+            'Проверьте, что кэш аутентификации заполняется с основной базы, '
+            'а не с отстающей реплики'
+        )
@@ -0,0 +1,47 @@
+import pytest
+
+from reviews.models import Title
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    @pytest.fixture
+    def titles(self, category):
+        return [
+            Title.objects.create(
+                name='Зеленая миля', year=1999, category=category,
+                description='Тюремная драма'),
+            Title.objects.create(
+                name='Побег из Шоушенка', year=1994, category=category,
+                description='Драма о тюрьме и надежде'),
+            Title.objects.create(
+                name='Тюрьма', year=2001, category=category,
+                description='Документальный фильм'),
+        ]
+
+    def search(self, client, query):
+        response = client.get('/api/v1/titles/', {'search': query})
+        assert response.status_code == 200
+        return [item['name'] for item in response.json()['results']]
+
+    def test_search_by_name_and_description(self, client, titles):
+        assert self.search(client, 'побег') == ['Побег из Шоушенка']
+        assert set(self.search(client, 'драма')) == {
+            'Зеленая миля', 'Побег из Шоушенка'}, (
+            'Проверьте, что поиск идет и по описанию произведения'
+        )
+
+    def test_name_match_ranked_first(self, client, titles):
+        assert self.search(client, 'тюрьм')[0] == 'Тюрьма', (
+            'Проверьте, что совпадение в названии важнее описания'
+        )
+
+    def test_index_follows_updates(self, client, titles):
+        title = titles[0]
+        title.name = 'Рыцарь'
+        title.save()
+        assert self.search(client, 'рыцарь') == ['Рыцарь']
+        assert self.search(client, 'зеленая') == []
+        title.delete()
+        assert self.search(client, 'рыцарь') == []
@@ -0,0 +1,148 @@
+import time
+
+import pytest
+from rest_framework.test import APIClient
+
+from api import throttling
+from api.throttling import (LOCK_TIMEOUT, get_throttle_cache, take,
+                            take_token)
+
+RATES = {
+    'signup_ip': '5/min',
+    'signup_user': '2/hour',
+    'token_ip': '30/hour',
+    'token_user': '10/hour',
+    'write_ip': None,
+    'write_user': '1/min',
+}
+
+
+@pytest.fixture
+def rates(settings):
+    settings.REST_FRAMEWORK = dict(
+        settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES=RATES)
+
+
+class TestTokenBucket:
+
+    def test_take_token(self):
+        state, wait = None, 0
+        for _ in range(2):
+            state, wait = take_token(state, 100, capacity=2, period=60)
+            assert wait == 0
+        state, wait = take_token(state, 100, capacity=2, period=60)
+        assert wait == pytest.approx(30), (
+            'Проверьте, что пустая корзина сообщает время до нового жетона'
+        )
+        state, wait = take_token(state, 130, capacity=2, period=60)
+        assert wait == 0, 'Проверьте, что жетоны восполняются со временем'
+
+    def test_local_fallback(self, monkeypatch):
+        def unavailable():
+            raise ConnectionError
+
+        monkeypatch.setattr(throttling, 'get_throttle_cache', unavailable)
+        key = 'throttle:test:fallback'
+        assert take(key, 1, 60) == 0
+        assert take(key, 1, 60) > 0, (
+            'Проверьте, что без кэша лимит соблюдается корзиной процесса'
+        )
+
+    def test_contention(self):
+        key = 'throttle:test:contention'
+        cache = get_throttle_cache()
+        cache.add(f'{key}:lock', 1, timeout=LOCK_TIMEOUT)
+        assert take(key, 2, 60) == pytest.approx(30), (
+            'Проверьте, что при занятой корзине жетон не выдается, а '
+            'Retry-After считается по времени восполнения жетона'
+        )
+        cache.set(key, (0, time.time()))
+        assert take(key, 2, 60) == pytest.approx(30, abs=1)
+        cache.delete(f'{key}:lock')
+        assert take(key, 2, 60) > 0, (
+            'Проверьте, что занятая корзина не дает новых жетонов'
+        )
+
+
+@pytest.mark.django_db
+class TestThrottling:
+
+    def test_signup_per_username(self, client, rates):
+        data = {'username': 'newuser', 'email': 'newuser@yamdb.fake'}
+        assert client.post(
+            '/api/v1/auth/signup/', data=data).status_code == 200
+        assert client.post(
+            '/api/v1/auth/signup/', data=data).status_code == 400, (
+            'Проверьте, что отклоненные попытки тоже расходуют лимит'
+        )
+        response = client.post('/api/v1/auth/signup/', data=data)
+        assert response.status_code == 429, (
+            'Проверьте, что число регистраций на username ограничено'
+        )
+        assert int(response['Retry-After']) > 0, (
+            'Проверьте, что ответ 429 содержит заголовок Retry-After'
+        )
+        other = {'username': 'other', 'email': 'other@yamdb.fake'}
+        assert client.post(
+            '/api/v1/auth/signup/', data=other).status_code == 200
+
+    def test_signup_per_address(self, client, rates):
+        statuses = [
+            client.post('/api/v1/auth/signup/', data={
+                'username': f'user{number}',
+                'email': f'user{number}@yamdb.fake',
+            }).status_code
+            for number in range(6)
+        ]
+        assert statuses == [200] * 5 + [429], (
+            'Проверьте, что число регистраций с одного IP-адреса ограничено'
+        )
+
+    def test_review_posts_per_user(self, user_client, admin_client, title,
+                                   rates):
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        data = {'text': 'Ок', 'score': 7}
+        assert user_client.post(url, data).status_code == 201
+        assert user_client.post(url, data).status_code == 429, (
+            'Проверьте, что создание отзывов ограничено на пользователя'
+        )
+        assert user_client.get(url).status_code == 200, (
+            'Проверьте, что чтение не ограничивается'
+        )
+        assert admin_client.post(url, data).status_code == 201
+        assert APIClient().post(url, data).status_code == 401
+
+    def test_spoofed_forwarded_for(self, client, rates):
+        statuses = [
+            client.post(
+                '/api/v1/auth/signup/',
+                data={
+                    'username': f'user{number}',
+                    'email': f'user{number}@yamdb.fake',
+                },
+                HTTP_X_FORWARDED_FOR=f'10.1.1.{number}, 203.0.113.7',
+            ).status_code
+            for number in range(6)
+        ]
+        assert statuses == [200] * 5 + [429], (
+            'Проверьте, что адреса, подставленные клиентом в '
+            'X-Forwarded-For, не дают новую корзину'
+        )
+
+    def test_clients_behind_proxy(self, client, rates):
+        for address in ('203.0.113.7', '203.0.113.8'):
+            statuses = [
+                client.post(
+                    '/api/v1/auth/signup/',
+                    data={
+                        'username': f'user{number}{address[-1]}',
+                        'email': f'user{number}{address[-1]}@yamdb.fake',
+                    },
+                    HTTP_X_FORWARDED_FOR=address,
+                    REMOTE_ADDR='172.18.0.5',
+                ).status_code
+                for number in range(5)
+            ]
+            assert statuses == [200] * 5, (
+                'Проверьте, что клиенты за прокси получают разные корзины'
+            )